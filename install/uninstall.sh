@@ -70,6 +70,12 @@ remove_files() {
     echo_success "\tdevice.json does not exist in $CONFIG_DIR"
   fi
 
+  # Remove the runtime state store if it exists
+  if [ -f "$CONFIG_DIR/state.db" ]; then
+    rm -f "$CONFIG_DIR"/state.db*
+    echo_success "\tRemoved state.db."
+  fi
+
   # Remove plugins.json if it exists
   if [ -f "$CONFIG_DIR/plugins.json" ]; then
     rm "$CONFIG_DIR/plugins.json"
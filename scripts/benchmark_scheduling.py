@@ -0,0 +1,51 @@
+"""Micro-benchmark of the scheduling work done by the refresh task over large playlists.
+
+Each pass determines the active playlist, checks every plugin instance for a due refresh and
+computes the next scheduled refresh, as the refresh task, warm-up and scheduler do on every check.
+
+Run from the repository root: python -m scripts.benchmark_scheduling [playlists] [instances_per_playlist]
+"""
+import sys
+import timeit
+from datetime import datetime, timedelta, timezone
+from src.model import PlaylistManager, RefreshInfo
+
+PASSES = 20
+
+playlist_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+instance_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+now = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+playlists = []
+for p in range(playlist_count):
+    plugins = []
+    for i in range(instance_count):
+        refresh = {"interval": 900 * (i % 8 + 1)} if i % 2 else {"scheduled": f"{i % 24:02d}:{i % 60:02d}"}
+        plugins.append({
+            "plugin_id": "clock",
+            "name": f"Clock {i}",
+            "plugin_settings": {},
+            "refresh": refresh,
+            "latest_refresh_time": (now - timedelta(minutes=7 * i)).isoformat(),
+        })
+    start = (p * 2) % 24
+    playlists.append({"name": f"Playlist {p}", "start_time": f"{start:02d}:00", "end_time": f"{(start + 6) % 24:02d}:00", "plugins": plugins})
+
+playlist_manager = PlaylistManager.from_dict({"playlists": playlists})
+refresh_info = RefreshInfo("Playlist", "clock", now.isoformat(), None, "Playlist 0", "Clock 0")
+
+
+def scheduling_pass():
+    current_dt = now
+    for minute in range(0, 24 * 60, 60):
+        playlist_manager.determine_active_playlist(current_dt + timedelta(minutes=minute))
+    refresh_info.get_refresh_datetime()
+    for playlist in playlist_manager.playlists:
+        playlist.get_priority()
+        for plugin_instance in playlist.plugins:
+            plugin_instance.should_refresh(current_dt)
+            plugin_instance.get_next_scheduled_dt()
+
+
+seconds = min(timeit.repeat(scheduling_pass, number=PASSES, repeat=5)) / PASSES
+print(f"playlists: {playlist_count} | instances: {playlist_count * instance_count} | pass: {seconds * 1000:.2f} ms")
@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify, current_app, render_template, send_file
 import os
 from datetime import datetime
+from utils.startup_profiler import startup_profiler
+from utils.readiness import readiness
 
 main_bp = Blueprint("main", __name__)
 
@@ -39,4 +41,14 @@ def get_current_image():
     response = send_file(image_path, mimetype='image/png')
     response.headers['Last-Modified'] = last_modified.strftime('%a, %d %b %Y %H:%M:%S GMT')
     response.headers['Cache-Control'] = 'no-cache'
-    return response
\ No newline at end of file
+    return response
+
+@main_bp.route('/api/startup_profile')
+def get_startup_profile():
+    """Returns the startup phase timings and import costs of the running instance."""
+    return jsonify(startup_profiler.get_report())
+
+@main_bp.route('/api/status')
+def get_status():
+    """Returns whether the display, plugins and refresh task finished initializing."""
+    return jsonify(readiness.get_status())
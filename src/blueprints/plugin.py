@@ -1,14 +1,21 @@
-from flask import Blueprint, request, jsonify, current_app, render_template, send_from_directory
+from flask import Blueprint, request, jsonify, current_app, render_template, send_from_directory, Response, url_for
 from plugins.plugin_registry import get_plugin_instance
 from utils.app_utils import resolve_path, handle_request_files, parse_form
+from utils.readiness import readiness
 from refresh_task import ManualRefresh, PlaylistRefresh
 import json
 import os
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 plugin_bp = Blueprint("plugin", __name__)
 
+# Server-sent event streams of refresh jobs are closed after this long, so open pages can't hold
+# the few web server threads. EventSource reconnects on its own after SSE_RETRY_MS.
+SSE_TIMEOUT_SECONDS = 5
+SSE_RETRY_MS = 1000
+
 def _delete_plugin_instance_images(device_config, plugin_instance_obj):
     """Delete all images associated with a plugin instance."""
     # Delete the plugin instance's generated image
@@ -24,6 +31,7 @@ def _delete_plugin_instance_images(device_config, plugin_instance_obj):
     try:
         plugin_config = device_config.get_plugin(plugin_instance_obj.plugin_id)
         if plugin_config:
+            readiness.wait_for("plugins")
             plugin = get_plugin_instance(plugin_config)
             plugin.cleanup(plugin_instance_obj.settings)
     except Exception as e:
@@ -39,6 +47,7 @@ def plugin_page(plugin_id):
     # Find the plugin by id
     plugin_config = device_config.get_plugin(plugin_id)
     if plugin_config:
+        readiness.wait_for("plugins")
         try:
             plugin = get_plugin_instance(plugin_config)
             template_params = plugin.generate_settings_template()
@@ -203,6 +212,7 @@ def update_plugin_instance(instance_name):
 @plugin_bp.route('/display_plugin_instance', methods=['POST'])
 def display_plugin_instance():
     device_config = current_app.config['DEVICE_CONFIG']
+    readiness.wait_for("refresh_task")
     refresh_task = current_app.config['REFRESH_TASK']
     playlist_manager = device_config.get_playlist_manager()
 
@@ -220,15 +230,16 @@ def display_plugin_instance():
         if not plugin_instance:
             return jsonify({"success": False, "message": f"Plugin instance '{plugin_instance_name}' not found"}), 400
 
-        refresh_task.manual_update(PlaylistRefresh(playlist, plugin_instance, force=True))
+        job = refresh_task.submit_manual_update(PlaylistRefresh(playlist, plugin_instance, force=True))
     except Exception as e:
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
-    return jsonify({"success": True, "message": "Display updated"}), 200
+    return _job_response(job)
 
 @plugin_bp.route('/update_now', methods=['POST'])
 def update_now():
     device_config = current_app.config['DEVICE_CONFIG']
+    readiness.wait_for("refresh_task")
     refresh_task = current_app.config['REFRESH_TASK']
     display_manager = current_app.config['DISPLAY_MANAGER']
 
@@ -239,7 +250,8 @@ def update_now():
 
         # Check if refresh task is running
         if refresh_task.running:
-            refresh_task.manual_update(ManualRefresh(plugin_id, plugin_settings))
+            job = refresh_task.submit_manual_update(ManualRefresh(plugin_id, plugin_settings))
+            return _job_response(job)
         else:
             # In development mode, directly update the display
             logger.info("Refresh task not running, updating display directly")
@@ -256,3 +268,58 @@ def update_now():
         return jsonify({"error": f"An error occurred: {str(e)}"}), 500
 
     return jsonify({"success": True, "message": "Display updated"}), 200
+
+@plugin_bp.route('/refresh_queue')
+def refresh_queue_metrics():
+    readiness.wait_for("refresh_task")
+    refresh_task = current_app.config['REFRESH_TASK']
+    return jsonify(refresh_task.get_queue_metrics()), 200
+
+@plugin_bp.route('/refresh_jobs/<string:job_id>')
+def refresh_job_status(job_id):
+    readiness.wait_for("refresh_task")
+    refresh_task = current_app.config['REFRESH_TASK']
+    job = refresh_task.get_job(job_id)
+    if not job:
+        return jsonify({"error": f"Refresh job '{job_id}' not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+@plugin_bp.route('/refresh_jobs/<string:job_id>/events')
+def refresh_job_events(job_id):
+    """Streams the job status as server-sent events until the job is finished or SSE_TIMEOUT_SECONDS
+    pass, clients reconnect to keep following the job."""
+    readiness.wait_for("refresh_task")
+    refresh_task = current_app.config['REFRESH_TASK']
+    job = refresh_task.get_job(job_id)
+    if not job:
+        return jsonify({"error": f"Refresh job '{job_id}' not found"}), 404
+
+    def stream():
+        yield f"retry: {SSE_RETRY_MS}\n\n"
+        status = None
+        deadline = time.monotonic() + SSE_TIMEOUT_SECONDS
+        while True:
+            if job.status != status:
+                status = job.status
+                yield f"event: status\ndata: {json.dumps(job.to_dict())}\n\n"
+                if job.is_finished():
+                    return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            job.wait_for_change(status, timeout=remaining)
+
+    return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+def _job_response(job):
+    """Returns the 202 response for a queued refresh job, or an error if it could not be queued."""
+    if job.status == job.FAILED:
+        return jsonify({"error": f"An error occurred: {job.error}"}), 500
+    if job.status == job.CANCELLED:
+        return jsonify({"error": job.error}), 503
+    return jsonify({
+        "success": True,
+        "message": "Display update queued",
+        "job_id": job.id,
+        "status_url": url_for("plugin.refresh_job_status", job_id=job.id)
+    }), 202
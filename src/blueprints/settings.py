@@ -5,6 +5,7 @@ import os
 import pytz
 import logging
 import io
+from utils.readiness import readiness
 
 # Try to import cysystemd for journal reading (Linux only)
 try:
@@ -71,8 +72,9 @@ def save_settings():
             settings["image_settings"]["inky_saturation"] = float(form_data.get("inky_saturation", "0.5"))
         device_config.update_config(settings)
 
-        if plugin_cycle_interval_seconds != previous_interval_seconds:
-            # wake the background thread up to signal interval config change
+        if plugin_cycle_interval_seconds != previous_interval_seconds and readiness.is_ready("refresh_task"):
+            # wake the background thread up to signal interval config change, a task still
+            # starting up reads the new interval when it starts
             refresh_task = current_app.config['REFRESH_TASK']
             refresh_task.signal_config_change()
     except RuntimeError as e:
@@ -84,6 +86,8 @@ def save_settings():
 @settings_bp.route('/shutdown', methods=['POST'])
 def shutdown():
     data = request.get_json() or {}
+    # write pending config changes before the system goes down
+    current_app.config['DEVICE_CONFIG'].flush_config()
     if data.get("reboot"):
         logger.info("Reboot requested")
         os.system("sudo reboot")
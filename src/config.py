@@ -3,6 +3,8 @@ import json
 import logging
 from dotenv import load_dotenv
 from model import PlaylistManager, RefreshInfo
+from utils.config_writer import ConfigWriter, DEFAULT_DELAY_SECONDS
+from utils.state_store import StateStore
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,9 @@ class Config:
     # File paths relative to the script's directory
     config_file = os.path.join(BASE_DIR, "config", "device.json")
 
+    # Runtime state that changes on every refresh, kept out of the config file
+    state_file = os.path.join(BASE_DIR, "config", "state.db")
+
     # File path for storing the current image being displayed
     current_image_file = os.path.join(BASE_DIR, "static", "images", "current_image.png")
 
@@ -22,8 +27,12 @@ class Config:
     def __init__(self):
         self.config = self.read_config()
         self.plugins_list = self.read_plugins_list()
+        self.plugins_by_id = {plugin['id']: plugin for plugin in self.plugins_list}
         self.playlist_manager = self.load_playlist_manager()
         self.refresh_info = self.load_refresh_info()
+        self.writer = ConfigWriter(self.config_file, self.get_config("config_write_delay_seconds", default=DEFAULT_DELAY_SECONDS))
+        self.state_store = StateStore(self.state_file)
+        self.load_state()
 
     def read_config(self):
         """Reads the device config JSON file and returns it as a dictionary."""
@@ -53,12 +62,64 @@ class Config:
         return plugins_list
 
     def write_config(self):
-        """Updates the cached config from the model objects and writes to the config file."""
+        """Updates the cached config from the model objects and schedules a write of the config file.
+
+        The config is serialized right away so the file reflects this call, the write itself happens
+        shortly after on a background thread, see `utils.config_writer`. Call `flush_config()` to
+        write it immediately.
+        """
         logger.debug(f"Writing device config to {self.config_file}")
-        self.update_value("playlist_config", self.playlist_manager.to_dict())
-        self.update_value("refresh_info", self.refresh_info.to_dict())
-        with open(self.config_file, 'w') as outfile:
-            json.dump(self.config, outfile, indent=4)
+        # without a state store the runtime state stays in the config file, as in older versions
+        include_state = not self.state_store.available
+        self.update_value("playlist_config", self.playlist_manager.to_dict(include_state=include_state))
+        if include_state:
+            self.config["refresh_info"] = self.refresh_info.to_dict()
+        else:
+            self.config.pop("refresh_info", None)
+        self.writer.write(json.dumps(self.config, indent=4))
+        if not include_state:
+            self.write_state()
+
+    def write_state(self):
+        """Saves the runtime state, refresh info and playlist positions, to the state store.
+
+        Use instead of `write_config()` when only runtime state changed, e.g. after a refresh.
+        Falls back to writing the config file when the state store could not be opened.
+
+        Returns:
+            bool: False if the state could not be saved to the state store.
+        """
+        if not self.state_store.available:
+            self.write_config()
+            return False
+
+        state = self.playlist_manager.get_state()
+        state["refresh_info"] = self.refresh_info.to_dict()
+        return self.state_store.save(state)
+
+    def load_state(self):
+        """Restores the runtime state from the state store.
+
+        State from older versions is stored in device.json, it is moved to the state store on first start.
+        """
+        if not self.state_store.available:
+            return
+
+        if self.state_store.is_empty():
+            # the runtime keys are only stripped from the config file once the state store has them
+            if "refresh_info" in self.config and self.write_state():
+                logger.info("Moved runtime state from device config to state store")
+                self.write_config()
+            return
+
+        self.playlist_manager.apply_state(self.state_store.values)
+        refresh_info = self.state_store.get("refresh_info")
+        if refresh_info:
+            self.refresh_info = RefreshInfo.from_dict(refresh_info)
+
+    def flush_config(self):
+        """Writes any pending config changes to the config file now."""
+        self.writer.flush()
 
     def get_config(self, key=None, default={}):
         """Gets the value of a specific configuration key or returns the entire config if none provided."""
@@ -72,7 +133,7 @@ class Config:
 
     def get_plugin(self, plugin_id):
         """Finds and returns a plugin config by its ID."""
-        return next((plugin for plugin in self.plugins_list if plugin['id'] == plugin_id), None)
+        return self.plugins_by_id.get(plugin_id)
 
     def get_resolution(self):
         """Returns the display resolution as a tuple (width, height) from the configuration."""
@@ -2,8 +2,9 @@ import fnmatch
 import json
 import logging
 import os
+import threading
 
-from utils.image_utils import resize_image, change_orientation, apply_image_enhancement
+from utils.image_utils import prepare_display_image
 from display.mock_display import MockDisplay
 from PIL import Image, ImageDraw, ImageFont
 
@@ -38,6 +39,9 @@ class DisplayManager:
         """
         
         self.device_config = device_config
+
+        # serializes access to the panel between the display worker and direct callers
+        self.display_lock = threading.RLock()
      
         display_type = device_config.get_config("display_type", default="inky")
 
@@ -56,7 +60,7 @@ class DisplayManager:
         else:
             raise ValueError(f"Unsupported display type: {display_type}")
 
-    def display_image(self, image, image_settings=[]):
+    def display_image(self, image, image_settings=[], frame=None):
         
         """
         Delegates image rendering to the appropriate display instance.
@@ -64,6 +68,7 @@ class DisplayManager:
         Args:
             image (PIL.Image): The image to be displayed.
             image_settings (list, optional): List of settings to modify image rendering.
+            frame (PIL.Image, optional): The image already processed by `prepare_image`.
 
         Raises:
             ValueError: If no valid display instance is found.
@@ -76,14 +81,29 @@ class DisplayManager:
         logger.info(f"Saving image to {self.device_config.current_image_file}")
         image.save(self.device_config.current_image_file)
 
-        # Resize and adjust orientation
-        image = change_orientation(image, self.device_config.get_config("orientation"))
-        image = resize_image(image, self.device_config.get_resolution(), image_settings)
-        if self.device_config.get_config("inverted_image"): image = image.rotate(180)
-        image = apply_image_enhancement(image, self.device_config.get_config("image_settings"))
+        if frame is None:
+            frame = self.prepare_image(image, image_settings)
 
         # Pass to the concrete instance to render to the device.
-        self.display.display_image(image, image_settings)
+        with self.display_lock:
+            self.display.display_image(frame, image_settings)
+
+    def prepare_image(self, image, image_settings=[]):
+        """
+        Resizes, adjusts the orientation and applies the image enhancements in a single pass,
+        returning the frame sent to the display.
+
+        Args:
+            image (PIL.Image): The image to be displayed.
+            image_settings (list, optional): List of settings to modify image rendering.
+        """
+        return prepare_display_image(
+            image,
+            self.device_config.get_resolution(),
+            orientation=self.device_config.get_config("orientation"),
+            inverted=self.device_config.get_config("inverted_image"),
+            image_settings=image_settings,
+            enhancements=self.device_config.get_config("image_settings"))
 
     def display_overlay(self, text="Updating...", position=("right", "bottom")):
         """Render a small overlay (text) on the currently displayed image and show it.
@@ -137,6 +157,7 @@ class DisplayManager:
             draw.text((x + padding, y + padding), text, fill=(255, 255, 255), font=font)
 
             # send directly to concrete display (no resizing/orientation)
-            self.display.display_image(base, [])
+            with self.display_lock:
+                self.display.display_image(base, [])
         except Exception as e:
             logger.exception(f"Failed to render overlay: {e}")
\ No newline at end of file
@@ -0,0 +1,116 @@
+import logging
+import threading
+
+from model import RefreshInfo
+from refresh_jobs import RefreshJob
+
+logger = logging.getLogger(__name__)
+
+class DisplayWorker:
+    """Displays frames on the panel from a dedicated thread.
+
+    The refresh task renders images and hands the post-processed frames to this worker, so the
+    next image can be generated while the panel is still refreshing. Only the newest frame is
+    kept: a frame still waiting when a newer one arrives is dropped and its job cancelled.
+
+    The refresh info of a frame is saved only once the frame is on the panel, so a frame that
+    fails to display or is dropped is not recorded as displayed and is retried by the next refresh.
+
+    Attributes:
+        display_manager (DisplayManager): Display manager used to draw the frames.
+        on_idle (callable, optional): Called without arguments whenever no frame is left to display.
+    """
+
+    def __init__(self, display_manager, on_idle=None):
+        self.display_manager = display_manager
+        self.on_idle = on_idle
+
+        self.thread = None
+        self.condition = threading.Condition()
+        self.running = False
+        self.pending = None
+        self.busy = False
+
+    def start(self):
+        """Starts the display thread."""
+        if not self.thread or not self.thread.is_alive():
+            self.running = True
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        """Stops the display thread after the frame being displayed, if any, is finished."""
+        with self.condition:
+            self.running = False
+            pending, self.pending = self.pending, None
+            self.condition.notify_all()
+        if pending and pending["job"]:
+            pending["job"].set_status(RefreshJob.CANCELLED)
+        if self.thread:
+            self.thread.join()
+
+    def submit(self, image, frame, image_settings=[], job=None, refresh_info=None):
+        """Queues a frame for display, replacing the frame still waiting if there is one.
+
+        Args:
+            image (PIL.Image): The generated image, saved as the current image.
+            frame (PIL.Image): The image processed by `DisplayManager.prepare_image`.
+            image_settings (list, optional): List of settings to modify image rendering.
+            job (RefreshJob, optional): Job that produced the frame, updated as it is displayed.
+            refresh_info (dict, optional): Refresh info saved to the device config once the frame is displayed.
+        """
+        with self.condition:
+            replaced, self.pending = self.pending, {
+                "image": image, "frame": frame, "image_settings": image_settings, "job": job, "refresh_info": refresh_info
+            }
+            self.condition.notify_all()
+        if replaced and replaced["job"]:
+            replaced["job"].error = "Superseded by a newer frame"
+            replaced["job"].set_status(RefreshJob.CANCELLED)
+
+    def is_idle(self):
+        """Returns True if no frame is waiting or being displayed."""
+        with self.condition:
+            return not self.pending and not self.busy
+
+    def wait_until_idle(self, timeout=None):
+        """Blocks until no frame is waiting or being displayed, returns False if the timeout expired first."""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.busy, timeout=timeout)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or not self.running)
+                if not self.running:
+                    break
+                item, self.pending = self.pending, None
+                self.busy = True
+
+            job = item["job"]
+            try:
+                if job and job.is_cancelled():
+                    logger.info(f"Refresh cancelled, skipping display update. | job_id: {job.id}")
+                    job.set_status(RefreshJob.CANCELLED)
+                    continue
+
+                if job:
+                    job.set_status(RefreshJob.DISPLAYING)
+                self.display_manager.display_image(item["image"], image_settings=item["image_settings"], frame=item["frame"])
+                if item["refresh_info"] is not None:
+                    device_config = self.display_manager.device_config
+                    device_config.refresh_info = RefreshInfo(**item["refresh_info"])
+                    device_config.write_state()
+                if job:
+                    job.set_status(RefreshJob.DONE)
+            except Exception as e:
+                logger.exception("Exception while updating the display")
+                if job:
+                    job.set_status(RefreshJob.FAILED, exception=e)
+            finally:
+                with self.condition:
+                    self.busy = False
+                    idle = not self.pending
+                    self.condition.notify_all()
+                if idle and self.on_idle:
+                    self.on_idle()
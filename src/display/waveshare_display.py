@@ -2,31 +2,119 @@ import inspect
 import importlib
 import logging
 import sys
+import time
 
+import numpy as np
 from display.abstract_display import AbstractDisplay
-from PIL import Image
+from PIL import Image, ImageChops
 from pathlib import Path
 from plugins.plugin_registry import get_plugin_instance
+from utils.dither import quantize, split_layers, pack_plane, BLACK_WHITE_RED_PALETTE, DEFAULT_DITHER
 
 logger = logging.getLogger(__name__)
 
+# Method names used by the Waveshare drivers for partial updates, in order of preference
+PARTIAL_DISPLAY_METHODS = ("display_Partial", "displayPartial", "display_partial")
+PARTIAL_INIT_METHODS = ("init_part", "init_Partial", "init_partial")
+PARTIAL_BASE_METHODS = ("display_Base", "displayPartBaseImage", "display_base")
 
-def split_image_for_bi_color_epd(image):
+DEFAULT_FULL_REFRESH_EVERY = 10
+
+# Indices of the black and red layers in BLACK_WHITE_RED_PALETTE
+BLACK_INDEX, RED_INDEX = 0, 2
+
+# (first byte, second byte) of the driver buffer of a white probe image with a black first pixel,
+# mapped to the (bitorder, inverted) layout of the buffer
+BUFFER_LAYOUTS = {
+    (0x7F, 0xFF): ("big", False),
+    (0xFE, 0xFF): ("little", False),
+    (0x80, 0x00): ("big", True),
+    (0x01, 0x00): ("little", True),
+}
+
+# Anti-ghosting policies deciding when the panel is cleared before a full refresh
+CLEAR_POLICIES = ("always", "every_n", "interval", "threshold")
+DEFAULT_CLEAR_POLICY = "every_n"
+DEFAULT_CLEAR_EVERY = 10
+DEFAULT_CLEAR_INTERVAL_HOURS = 24
+DEFAULT_CLEAR_THRESHOLD = 0.5
+
+
+def split_image_for_bi_color_epd(image, dither=DEFAULT_DITHER):
     """
     Convert image into two 1-bit layers for bi-color (black and red) e-paper displays.
     """
-    black = (0, 0, 0)
-    white = (255, 255, 255)
-    red = (255, 0, 0)
+    indices = quantize(image, BLACK_WHITE_RED_PALETTE, dither)
+    black_layer, red_layer = split_layers(indices, [BLACK_INDEX, RED_INDEX])
+    return black_layer, red_layer
 
-    palette_data = [*black, *white, *red]
-    palette_img = Image.new('P', (1, 1))
-    palette_img.putpalette(palette_data)
 
-    indexed_img = image.quantize(palette=palette_img, dither=Image.Dither.FLOYDSTEINBERG)
-    black_layer = indexed_img.point(lambda p: 0 if p == 0 else 1, mode='1')
-    red_layer = indexed_img.point(lambda p: 0 if p == 2 else 1, mode='1')
-    return black_layer, red_layer
+def find_driver_method(epd_display, method_names):
+    """
+    Returns the first callable method of the driver with one of the given names, or None.
+    """
+    for method_name in method_names:
+        method = getattr(epd_display, method_name, None)
+        if callable(method):
+            return method
+    return None
+
+
+def get_dirty_rect(buffer, last_buffer, width, height):
+    """
+    Computes the region that changed between two 1-bit panel buffers.
+
+    Buffers are in the panel's native orientation with one bit per pixel and rows padded
+    to whole bytes, so the horizontal bounds are aligned to 8 pixels.
+
+    Returns:
+        tuple: (x_start, y_start, x_end, y_end) of the changed region, or None if the
+               buffers are identical or not in the 1-bit layout.
+    """
+    stride = (width + 7) // 8
+    if len(buffer) != stride * height or len(last_buffer) != stride * height:
+        return None
+
+    x_start, x_end, y_start, y_end = stride, 0, None, None
+    for y in range(height):
+        row = buffer[y * stride:(y + 1) * stride]
+        last_row = last_buffer[y * stride:(y + 1) * stride]
+        if row == last_row:
+            continue
+        if y_start is None:
+            y_start = y
+        y_end = y + 1
+        first = next(i for i in range(stride) if row[i] != last_row[i])
+        last = next(i for i in reversed(range(stride)) if row[i] != last_row[i])
+        x_start, x_end = min(x_start, first), max(x_end, last + 1)
+
+    if y_start is None:
+        return None
+    return x_start * 8, y_start, min(x_end * 8, width), y_end
+
+
+def crop_buffer(buffer, width, rect):
+    """
+    Extracts the bytes of a byte-aligned region from a 1-bit panel buffer.
+    """
+    stride = (width + 7) // 8
+    x_start, y_start, x_end, y_end = rect
+    first, last = x_start // 8, (x_end + 7) // 8
+    region = bytearray()
+    for y in range(y_start, y_end):
+        region += buffer[y * stride + first:y * stride + last]
+    return region
+
+
+def get_changed_fraction(image, other_image):
+    """
+    Returns the fraction of pixels that differ between two images of the same size.
+    """
+    if image.size != other_image.size:
+        return 1.0
+    diff = ImageChops.difference(image.convert("L"), other_image.convert("L"))
+    changed = sum(diff.point(lambda p: 255 if p > 32 else 0).histogram()[255:])
+    return changed / (image.width * image.height)
 
 
 class WaveshareDisplay(AbstractDisplay):
@@ -91,6 +179,31 @@ class WaveshareDisplay(AbstractDisplay):
 
         self.bi_color_display = len(display_args_spec.args) > 2
 
+        # Partial update support differs between drivers, some only redraw the whole panel with
+        # the fast waveform while others (e.g. epd7in5_V2) also accept a window to update.
+        self.partial_display = find_driver_method(self.epd_display, PARTIAL_DISPLAY_METHODS)
+        self.partial_display_init = find_driver_method(self.epd_display, PARTIAL_INIT_METHODS)
+        self.partial_base_display = find_driver_method(self.epd_display, PARTIAL_BASE_METHODS)
+        self.partial_display_windowed = bool(self.partial_display) and \
+            len(inspect.getfullargspec(self.partial_display).args) >= 6
+        self.last_buffer = None
+        self.partial_count = 0
+
+        self.buffer_layout = None
+        self.buffer_layout_detected = False
+        self.last_image = None
+        self.last_clear_time = None
+        self.refreshes_since_clear = 0
+        self.refresh_stats = {
+            "display_type": display_type,
+            "full_refreshes": 0,
+            "partial_refreshes": 0,
+            "clears": 0,
+            "last_clear_seconds": None,
+            "last_full_refresh_seconds": None,
+            "last_partial_refresh_seconds": None,
+        }
+
         # update the resolution directly from the loaded device context
         if not self.device_config.get_config("resolution"):
             w, h = int(self.epd_display.width), int(self.epd_display.height)
@@ -121,23 +234,181 @@ class WaveshareDisplay(AbstractDisplay):
         if not image:
             raise ValueError(f"No image provided.")
 
+        if not self.bi_color_display and self.partial_display and \
+                self.device_config.get_config("partial_refresh", default=False):
+            buffer = bytes(self.epd_display.getbuffer(image))
+            if buffer == self.last_buffer:
+                logger.info("Image unchanged, skipping Waveshare display update.")
+                return
+            if self.last_buffer is not None and self.partial_count < self.get_full_refresh_every():
+                self.display_partial(buffer)
+            else:
+                self.display_full(image, buffer)
+            self.last_buffer = buffer
+            self.last_image = image
+        else:
+            self.display_full(image)
+            self.last_buffer = None
+
+        # Put device into low power mode (EPD displays maintain image when powered off)
+        logger.info("Putting Waveshare display into sleep mode for power saving.")
+        self.epd_display.sleep()
+
+    def display_full(self, image, buffer=None):
+        """
+        Draws the image with a full refresh, clearing the panel first when the clear policy asks for it.
+
+        Args:
+            image (PIL.Image): The image to be displayed.
+            buffer (bytes, optional): Panel buffer of the image, given when partial refresh is
+                enabled. The driver's base-image method is used when available so the following
+                partial updates are compared against this image.
+        """
         # Assume device was in sleep mode.
         self.epd_display_init()
 
-        # Clear residual pixels before updating the image.
-        self.epd_display.Clear()
+        # Clear residual pixels before updating the image, as configured by the clear policy.
+        if self.should_clear(image):
+            start = time.monotonic()
+            self.epd_display.Clear()
+            self.last_clear_time = time.monotonic()
+            self.refreshes_since_clear = 0
+            self.refresh_stats["clears"] += 1
+            self.refresh_stats["last_clear_seconds"] = round(self.last_clear_time - start, 2)
+
+        start = time.monotonic()
 
         # Display the image on the WS display.
-        if not self.bi_color_display:
+        if buffer is not None:
+            (self.partial_base_display or self.epd_display.display)(buffer)
+        elif not self.bi_color_display:
             self.epd_display.display(self.epd_display.getbuffer(image))
         else:
-            black_layer, red_layer = split_image_for_bi_color_epd(image)
+            self.epd_display.display(*self.get_bi_color_buffers(image))
+        self.partial_count = 0
+        self.last_image = image
+        self.refreshes_since_clear += 1
+        self.record_refresh("full", time.monotonic() - start)
 
-            self.epd_display.display(
-                self.epd_display.getbuffer(black_layer),
-                self.epd_display.getbuffer(red_layer),
-            )
+    def display_partial(self, buffer):
+        """
+        Updates the panel with a partial refresh, only redrawing the changed region when the
+        driver supports windowed updates.
 
-        # Put device into low power mode (EPD displays maintain image when powered off)
-        logger.info("Putting Waveshare display into sleep mode for power saving.")
-        self.epd_display.sleep()
+        Args:
+            buffer (bytes): Panel buffer of the image.
+        """
+        width, height = int(self.epd_display.width), int(self.epd_display.height)
+        rect = get_dirty_rect(buffer, self.last_buffer, width, height)
+
+        logger.info(f"Partial refresh of Waveshare display. | region: {rect}")
+
+        start = time.monotonic()
+        (self.partial_display_init or self.epd_display_init)()
+        if self.partial_display_windowed and rect is not None:
+            self.partial_display(crop_buffer(buffer, width, rect), *rect)
+        elif self.partial_display_windowed:
+            self.partial_display(buffer, 0, 0, width, height)
+        else:
+            self.partial_display(buffer)
+        self.partial_count += 1
+        self.record_refresh("partial", time.monotonic() - start)
+
+    def get_full_refresh_every(self):
+        """
+        Returns the number of partial refreshes after which a full refresh is forced to clear ghosting.
+        """
+        return int(self.device_config.get_config("partial_refresh_full_every", default=DEFAULT_FULL_REFRESH_EVERY))
+
+    def get_bi_color_buffers(self, image):
+        """
+        Quantizes the image to black, white and red and returns the black and red driver buffers.
+
+        The layers are packed directly from the palette indices when the driver's buffer layout
+        is known, otherwise they are converted by the driver's getbuffer.
+
+        Args:
+            image (PIL.Image): The image to be displayed.
+        """
+        dither = self.device_config.get_config("dither", default=DEFAULT_DITHER)
+        indices = quantize(image, BLACK_WHITE_RED_PALETTE, dither)
+
+        width, height = int(self.epd_display.width), int(self.epd_display.height)
+        if indices.shape == (width, height) and width != height:
+            # landscape image on a portrait panel, rotated like the driver's getbuffer does
+            indices = np.rot90(indices)
+
+        buffer_layout = self.get_buffer_layout()
+        if indices.shape == (height, width) and buffer_layout is not None:
+            bitorder, inverted = buffer_layout
+            buffers = [pack_plane(indices != index, bitorder) for index in (BLACK_INDEX, RED_INDEX)]
+            if inverted:
+                buffers = [np.invert(buffer) for buffer in buffers]
+            return [bytearray(buffer.tobytes()) for buffer in buffers]
+
+        black_layer, red_layer = split_layers(indices, [BLACK_INDEX, RED_INDEX])
+        return self.epd_display.getbuffer(black_layer), self.epd_display.getbuffer(red_layer)
+
+    def get_buffer_layout(self):
+        """
+        Returns the (bitorder, inverted) layout of the driver's one bit per pixel buffers, or None
+        when the driver uses another format. Determined once by converting a white image whose
+        first pixel is black with the driver's getbuffer: the first byte gives the bit order of the
+        pixels and whether white is stored as 1 or 0, the remaining bytes must all be white.
+        """
+        if not self.buffer_layout_detected:
+            width, height = int(self.epd_display.width), int(self.epd_display.height)
+            probe = Image.new("1", (width, height), 255)
+            probe.putpixel((0, 0), 0)
+            buffer = bytes(self.epd_display.getbuffer(probe))
+
+            self.buffer_layout = None
+            if width >= 8 and len(buffer) == (width + 7) // 8 * height and len(set(buffer[1:])) == 1:
+                self.buffer_layout = BUFFER_LAYOUTS.get((buffer[0], buffer[1]))
+            self.buffer_layout_detected = True
+            logger.info(f"Detected driver buffer layout: {self.buffer_layout or 'unpacked'}")
+        return self.buffer_layout
+
+    def should_clear(self, image):
+        """
+        Decides whether the panel is cleared before a full refresh, based on the "clear_policy"
+        setting:
+            - always: clear before every full refresh.
+            - every_n: clear every "clear_every" full refreshes.
+            - interval: clear when the last clear is older than "clear_interval_hours".
+            - threshold: clear when the fraction of changed pixels exceeds "clear_threshold".
+
+        The panel is always cleared on the first refresh after startup.
+
+        Args:
+            image (PIL.Image): The image about to be displayed.
+        """
+        policy = self.device_config.get_config("clear_policy", default=DEFAULT_CLEAR_POLICY)
+        if policy not in CLEAR_POLICIES:
+            logger.warning(f"Unknown clear policy '{policy}', using '{DEFAULT_CLEAR_POLICY}'.")
+            policy = DEFAULT_CLEAR_POLICY
+
+        if policy == "always" or self.last_clear_time is None or self.last_image is None:
+            return True
+        if policy == "every_n":
+            clear_every = int(self.device_config.get_config("clear_every", default=DEFAULT_CLEAR_EVERY))
+            return self.refreshes_since_clear >= clear_every
+        if policy == "interval":
+            interval_hours = float(self.device_config.get_config("clear_interval_hours", default=DEFAULT_CLEAR_INTERVAL_HOURS))
+            return time.monotonic() - self.last_clear_time >= interval_hours * 3600
+        threshold = float(self.device_config.get_config("clear_threshold", default=DEFAULT_CLEAR_THRESHOLD))
+        return get_changed_fraction(self.last_image, image) > threshold
+
+    def record_refresh(self, refresh_type, seconds):
+        """
+        Records the count and duration of a refresh, logged so the clear policy can be tuned per panel.
+        """
+        self.refresh_stats[f"{refresh_type}_refreshes"] += 1
+        self.refresh_stats[f"last_{refresh_type}_refresh_seconds"] = round(seconds, 2)
+        logger.info(f"Waveshare {refresh_type} refresh took {seconds:.2f}s. | stats: {self.refresh_stats}")
+
+    def get_refresh_stats(self):
+        """
+        Returns the refresh counts and timings recorded since startup.
+        """
+        return dict(self.refresh_stats)
@@ -3,6 +3,10 @@
 # set up logging
 import os, logging.config
 
+# time the rest of startup, see utils/startup_profiler.py
+from utils.startup_profiler import startup_profiler
+startup_profiler.install_import_timer()
+
 from pi_heif import register_heif_opener
 
 logging.config.fileConfig(os.path.join(os.path.dirname(__file__), 'config', 'logging.conf'))
@@ -13,6 +17,8 @@ warnings.filterwarnings("ignore", message=".*Busy Wait: Held high.*")
 
 import os
 import random
+import signal
+import socket
 import time
 import sys
 import json
@@ -21,19 +27,25 @@ import threading
 import argparse
 from datetime import datetime
 import pytz
-from utils.app_utils import generate_startup_image
+from utils.app_utils import generate_startup_image, get_ip_address, preload_fonts
 from utils.led_controller import LEDStripController
-from flask import Flask, request, send_from_directory
+from utils.render_server import render_server
+from utils.render_cache import render_cache
+from utils.static_frames import static_frames
+from utils.image_utils import set_render_concurrency
+from utils.readiness import readiness, SubsystemNotReady
+from flask import Flask, request, send_from_directory, jsonify
 from werkzeug.serving import is_running_from_reloader
 from config import Config
 from display.display_manager import DisplayManager
 from refresh_task import RefreshTask, PlaylistRefresh
+from refresh_jobs import PRIORITY_BUTTON
 from blueprints.main import main_bp
 from blueprints.settings import settings_bp
 from blueprints.plugin import plugin_bp
 from blueprints.playlist import playlist_bp
 from jinja2 import ChoiceLoader, FileSystemLoader
-from plugins.plugin_registry import load_plugins
+from plugins.plugin_registry import load_plugins, warm_up_plugins
 from waitress import serve
 
 try:
@@ -43,6 +55,7 @@ try:
 except (ImportError, BadPinFactory):
     GPIO_AVAILABLE = False
 
+startup_profiler.mark("imports")
 
 logger = logging.getLogger(__name__)
 
@@ -51,6 +64,8 @@ BUTTON_REFRESH_PIN = 6  # Physical pin 31
 BUTTON_NEXT_PIN = 26    # Physical pin 37
 BUTTON_LED_TOGGLE_PIN = 19  # Physical pin 35 (for LED strip toggle)
 
+WEB_SERVER_THREADS = 4
+
 # Parse command line arguments
 parser = argparse.ArgumentParser(description='InkyPi Display Server')
 parser.add_argument('--dev', action='store_true', help='Run in development mode')
@@ -59,6 +74,7 @@ args = parser.parse_args()
 # Set development mode settings
 if args.dev:
     Config.config_file = os.path.join(Config.BASE_DIR, "config", "device_dev.json")
+    Config.state_file = os.path.join(Config.BASE_DIR, "config", "state_dev.db")
     DEV_MODE = True
     PORT = 8080
     logger.info("Starting InkyPi in DEVELOPMENT mode on port 8080")
@@ -74,7 +90,8 @@ template_dirs = [
 ]
 app.jinja_loader = ChoiceLoader([FileSystemLoader(directory) for directory in template_dirs])
 
-device_config = Config()
+with startup_profiler.phase("config"):
+    device_config = Config()
 
 def setup_buttons(refresh_task, device_config, led_controller):
     """Initializes GPIO buttons and assigns actions for refresh, next plugin, and LED toggle."""
@@ -112,7 +129,7 @@ def setup_buttons(refresh_task, device_config, led_controller):
                 try:
                     display_manager.display_overlay("Updating...")
                     time.sleep(0.5)  # Give overlay time to be visible before refresh
-                    refresh_task.manual_update(action)
+                    refresh_task.manual_update(action, priority=PRIORITY_BUTTON)
                     logger.info("Refresh completed, overlay cleared by new image.")
                 except Exception as e:
                     logger.error(f"Error during async manual update: {e}", exc_info=True)
@@ -147,7 +164,7 @@ def setup_buttons(refresh_task, device_config, led_controller):
                 try:
                     display_manager.display_overlay("Updating...")
                     time.sleep(0.5)  # Give overlay time to be visible before refresh
-                    refresh_task.manual_update(action)
+                    refresh_task.manual_update(action, priority=PRIORITY_BUTTON)
                     logger.info("Plugin advance completed, overlay cleared by new image.")
                 except Exception as e:
                     logger.error(f"Error during async next-plugin refresh: {e}", exc_info=True)
@@ -187,16 +204,34 @@ def setup_buttons(refresh_task, device_config, led_controller):
         logger.error("This is expected if not running on a non-Raspberry Pi machine.")
 
 
-display_manager = DisplayManager(device_config)
-refresh_task = RefreshTask(device_config, display_manager)
-led_controller = LEDStripController()
-
-load_plugins(device_config.get_plugins())
-
-# Store dependencies
+# Display hardware and plugins are initialized in the background once the web server is up,
+# see initialize_subsystems()
+display_manager = None
+refresh_task = None
+readiness.register("display", "plugins", "refresh_task")
+
+with startup_profiler.phase("led_controller"):
+    led_controller = LEDStripController()
+
+# Keep a headless browser alive between HTML renders, see utils/render_server.py
+render_server_config = device_config.get_config("render_server")
+render_server.configure(
+    enabled=render_server_config.get("enabled", True),
+    idle_timeout=render_server_config.get("idle_timeout_seconds", 300)
+)
+# Browser renders allowed at once, single-use fallback browsers each take a lot of memory
+set_render_concurrency(render_server_config.get("max_concurrent_renders", 1))
+
+# Reuse screenshots of identical template renders, see utils/render_cache.py
+render_cache_config = device_config.get_config("render_cache")
+render_cache.configure(
+    enabled=render_cache_config.get("enabled", True),
+    max_bytes=render_cache_config.get("max_megabytes", 20) * 1024 * 1024,
+    max_age_seconds=render_cache_config.get("max_age_seconds", 24 * 60 * 60)
+)
+
+# Store dependencies, DISPLAY_MANAGER and REFRESH_TASK are added by initialize_subsystems()
 app.config['DEVICE_CONFIG'] = device_config
-app.config['DISPLAY_MANAGER'] = display_manager
-app.config['REFRESH_TASK'] = refresh_task
 app.config['LED_CONTROLLER'] = led_controller
 
 # Set additional parameters
@@ -208,24 +243,102 @@ app.register_blueprint(settings_bp)
 app.register_blueprint(plugin_bp)
 app.register_blueprint(playlist_bp)
 
+@app.errorhandler(SubsystemNotReady)
+def handle_subsystem_not_ready(e):
+    """Answers requests that need a subsystem still initializing in the background."""
+    response = jsonify({"error": str(e), "subsystem": e.name, "status": e.status})
+    response.status_code = 503
+    if e.status != "failed":
+        response.headers["Retry-After"] = "5"
+    return response
+
 # Register opener for HEIF/HEIC images
-register_heif_opener()
+with startup_profiler.phase("register_heif_opener"):
+    register_heif_opener()
 
-if __name__ == '__main__':
+def initialize_plugins():
+    """Registers the plugins and loads the ones the active playlist needs."""
+    try:
+        with startup_profiler.phase("load_plugins"):
+            load_plugins(device_config.get_plugins())
+        readiness.mark_ready("plugins")
+    except Exception as e:
+        readiness.mark_failed("plugins", e)
+        return
 
-    # start the background refresh task
-    refresh_task.start()
+    # plugins are imported on first use, load the ones the active playlist needs in the background
+    if device_config.get_config("plugin_warmup", default=True):
+        now = datetime.now(pytz.timezone(device_config.get_config("timezone", default="UTC")))
+        active_playlist = device_config.get_playlist_manager().determine_active_playlist(now)
+        if active_playlist:
+            plugin_ids = [plugin.plugin_id for plugin in active_playlist.plugins]
+            warm_up_plugins(plugin_ids)
+            # fonts the plugins draw with, declared in their plugin-info.json
+            plugin_configs = [device_config.get_plugin(plugin_id) for plugin_id in plugin_ids]
+            preload_fonts(font for plugin_config in plugin_configs if plugin_config
+                          for font in plugin_config.get("fonts", []))
 
-    # Set up GPIO buttons if not in development mode
-    if not DEV_MODE:
-        setup_buttons(refresh_task, device_config, led_controller)
+def initialize_subsystems():
+    """Initializes the display hardware and the plugins concurrently, then starts the refresh task.
+
+    Runs in the background so the web UI is served while the display is probed and initialized.
+    """
+    global display_manager, refresh_task
+
+    plugins_thread = threading.Thread(target=initialize_plugins, name="init-plugins", daemon=True)
+    plugins_thread.start()
+
+    try:
+        with startup_profiler.phase("display_init"):
+            display_manager = DisplayManager(device_config)
+        with startup_profiler.phase("refresh_task"):
+            refresh_task = RefreshTask(device_config, display_manager)
+        app.config['DISPLAY_MANAGER'] = display_manager
+        app.config['REFRESH_TASK'] = refresh_task
+        readiness.mark_ready("display")
+    except Exception as e:
+        logger.exception("Failed to initialize display")
+        readiness.mark_failed("display", e)
+        readiness.mark_failed("refresh_task", "display failed to initialize")
+        plugins_thread.join()
+        startup_profiler.finish()
+        return
 
     # display default inkypi image on startup
     if device_config.get_config("startup") is True:
         logger.info("Startup flag is set, displaying startup image")
-        img = generate_startup_image(device_config.get_resolution())
-        display_manager.display_image(img)
-        device_config.update_value("startup", False, write=True)
+        try:
+            with startup_profiler.phase("startup_image"):
+                dimensions = device_config.get_resolution()
+                if device_config.get_config("orientation") == "vertical":
+                    dimensions = dimensions[::-1]
+                # only drawn again when the resolution, orientation, hostname or IP address changed
+                img = static_frames.get("startup", dimensions, generate_startup_image,
+                                        hostname=socket.gethostname(), ip=get_ip_address())
+                display_manager.display_image(img)
+            device_config.update_value("startup", False, write=True)
+        except Exception:
+            logger.exception("Failed to display startup image")
+
+    # start the background refresh task once plugins are registered
+    plugins_thread.join()
+    refresh_task.start()
+    readiness.mark_ready("refresh_task")
+
+    # Set up GPIO buttons if not in development mode
+    if not DEV_MODE:
+        with startup_profiler.phase("gpio_buttons"):
+            setup_buttons(refresh_task, device_config, led_controller)
+
+    startup_profiler.finish()
+
+if __name__ == '__main__':
+
+    # exit through the finally block below on service stop, so pending config changes are written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # serve the web UI right away, the display and plugins are initialized meanwhile
+    threading.Thread(target=initialize_subsystems, name="init-subsystems", daemon=True).start()
 
     try:
         # Run the Flask app
@@ -233,17 +346,17 @@ if __name__ == '__main__':
 
         # Get local IP address for display (only in dev mode when running on non-Pi)
         if DEV_MODE:
-            import socket
-            try:
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                s.connect(("8.8.8.8", 80))
-                local_ip = s.getsockname()[0]
-                s.close()
+            local_ip = get_ip_address()
+            if local_ip:
                 logger.info(f"Serving on http://{local_ip}:{PORT}")
-            except:
-                pass  # Ignore if we can't get the IP
 
-        serve(app, host="0.0.0.0", port=PORT, threads=1)
+        startup_profiler.mark("web_server_ready")
+
+        # manual refreshes run on the refresh task, extra threads keep the UI responsive while polling job status
+        serve(app, host="0.0.0.0", port=PORT, threads=WEB_SERVER_THREADS)
     finally:
-        refresh_task.stop()
+        if refresh_task:
+            refresh_task.stop()
+        device_config.flush_config()
+        render_server.shutdown()
         led_controller.cleanup()
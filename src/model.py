@@ -1,22 +1,38 @@
 import os
 import json
 import logging
+from bisect import bisect_right
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+def parse_time(time_str):
+    """Parses an 'HH:MM' time of day, '24:00' being midnight."""
+    return datetime.strptime("00:00" if time_str == "24:00" else time_str, "%H:%M").time()
+
+def next_occurrence(time_of_day, after):
+    """Returns the first datetime strictly after `after` at the given time of day, a `time` or an 'HH:MM' string."""
+    if isinstance(time_of_day, str):
+        time_of_day = parse_time(time_of_day)
+    occurrence = after.replace(hour=time_of_day.hour, minute=time_of_day.minute, second=0, microsecond=0)
+    if occurrence <= after:
+        occurrence += timedelta(days=1)
+    return occurrence
+
 class RefreshInfo:
     """Keeps track of refresh metadata.
 
     Attributes:
         refresh_time (str): ISO-formatted time string of the refresh.
-        image_hash (int): SHA-256 hash of the image.
+        image_hash (str): Fingerprint of the displayed frame, see utils.change_detection.
         refresh_type (str): Refresh type ['Manual Update', 'Playlist'].
         plugin_id (str): Plugin id of the refresh.
         playlist (str): Playlist name if refresh_type is 'Playlist'.
         plugin_instance (str): Plugin instance name if refresh_type is 'Playlist'.
     """
 
+    __slots__ = ("_refresh_time", "_refresh_dt", "image_hash", "refresh_type", "plugin_id", "playlist", "plugin_instance")
+
     def __init__(self, refresh_type, plugin_id, refresh_time, image_hash, playlist=None, plugin_instance=None):
         """Initialize RefreshInfo instance."""
         self.refresh_time = refresh_time
@@ -26,12 +42,20 @@ class RefreshInfo:
         self.playlist = playlist
         self.plugin_instance = plugin_instance
 
+    @property
+    def refresh_time(self):
+        return self._refresh_time
+
+    @refresh_time.setter
+    def refresh_time(self, value):
+        self._refresh_time = value
+        self._refresh_dt = None
+
     def get_refresh_datetime(self):
-        """Returns the refresh time as a datetime object or None if not set."""
-        latest_refresh = None
-        if self.refresh_time:
-            latest_refresh = datetime.fromisoformat(self.refresh_time)
-        return latest_refresh
+        """Returns the refresh time as a datetime object or None if not set, parsed once per value."""
+        if self._refresh_dt is None and self._refresh_time:
+            self._refresh_dt = datetime.fromisoformat(self._refresh_time)
+        return self._refresh_dt
 
     def to_dict(self):
         refresh_dict = {
@@ -67,10 +91,35 @@ class PlaylistManager:
     DEFAULT_PLAYLIST_START = "00:00"
     DEFAULT_PLAYLIST_END = "24:00"
 
+    __slots__ = ("playlists", "active_playlist", "playlists_by_name", "segment_starts", "segment_playlists")
+
     def __init__(self, playlists=[], active_playlist=None):
         """Initialize PlaylistManager with a list of playlists."""
         self.playlists = playlists
         self.active_playlist = active_playlist
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuilds the playlist index by name and the active playlist table, called after every change
+        to the playlists or their time windows."""
+        self.playlists_by_name = {}
+        for playlist in self.playlists:
+            self.playlists_by_name.setdefault(playlist.name, playlist)
+
+        # The day is split at every playlist start and end time, within a segment the same playlists
+        # are active, so the active playlist of each segment is resolved once here and looked up by
+        # bisecting the segment start minutes.
+        boundaries = {0}
+        for playlist in self.playlists:
+            for time_str in (playlist.start_time, playlist.end_time):
+                boundaries.add(Playlist.to_minutes(time_str) % (24 * 60))
+        self.segment_starts = sorted(boundaries)
+        self.segment_playlists = []
+        for minute in self.segment_starts:
+            current_time = f"{minute // 60:02d}:{minute % 60:02d}"
+            active_playlists = [p for p in self.playlists if p.is_active(current_time)]
+            # min() keeps the first of equal priorities, like the stable sort it replaces
+            self.segment_playlists.append(min(active_playlists, key=lambda p: p.get_priority()) if active_playlists else None)
 
     def get_playlist_names(self):
         """Returns a list of all playlist names."""
@@ -78,8 +127,9 @@ class PlaylistManager:
 
     def add_default_playlist(self):
         """Add a default playlist to the manager, called when no playlists exist."""
-        return self.playlists.append(
+        self.playlists.append(
             Playlist("Default", PlaylistManager.DEFAULT_PLAYLIST_START, PlaylistManager.DEFAULT_PLAYLIST_END, []))
+        self._reindex()
 
     def find_plugin(self, plugin_id, instance):
         """Searches playlists to find a plugin with the given ID and instance."""
@@ -90,23 +140,16 @@ class PlaylistManager:
         return None
 
     def determine_active_playlist(self, current_datetime):
-        """Determine the active playlist based on the current time."""
-        current_time = current_datetime.strftime("%H:%M")  # Get current time in "HH:MM" format
-
-        # get active playlists that have plugins
-        active_playlists = [p for p in self.playlists if p.is_active(current_time)]
-        if not active_playlists:
-            return None
+        """Determine the active playlist based on the current time.
 
-        # Sort playlists by priority
-        active_playlists.sort(key=lambda p: p.get_priority())
-        playlist = active_playlists[0]
-
-        return playlist
+        When several playlists are active, the one with the shortest time window wins.
+        """
+        minute = current_datetime.hour * 60 + current_datetime.minute
+        return self.segment_playlists[bisect_right(self.segment_starts, minute) - 1]
 
     def get_playlist(self, playlist_name):
         """Returns the playlist with the specified name."""
-        return next((p for p in self.playlists if p.name == playlist_name), None)
+        return self.playlists_by_name.get(playlist_name)
 
     def add_plugin_to_playlist(self, playlist_name, plugin_data):
         """Adds a plugin to a playlist by the specified name. Returns true if successfully added,
@@ -126,6 +169,7 @@ class PlaylistManager:
         if not end_time:
             end_time = PlaylistManager.DEFAULT_PLAYLIST_END
         self.playlists.append(Playlist(name, start_time, end_time))
+        self._reindex()
         return True
 
     def update_playlist(self, old_name, new_name, start_time, end_time):
@@ -135,6 +179,7 @@ class PlaylistManager:
             playlist.name = new_name
             playlist.start_time = start_time
             playlist.end_time = end_time
+            self._reindex()
             return True
         logger.warning(f"Playlist '{old_name}' not found.")
         return False
@@ -142,12 +187,26 @@ class PlaylistManager:
     def delete_playlist(self, name):
         """Deletes the playlist with the specified name."""
         self.playlists = [p for p in self.playlists if p.name != name]
+        self._reindex()
 
-    def to_dict(self):
-        return {
-            "playlists": [p.to_dict() for p in self.playlists],
-            "active_playlist": self.active_playlist
-        }
+    def to_dict(self, include_state=True):
+        playlist_dict = {"playlists": [p.to_dict(include_state) for p in self.playlists]}
+        if include_state:
+            playlist_dict["active_playlist"] = self.active_playlist
+        return playlist_dict
+
+    def get_state(self):
+        """Returns the runtime state of the playlists and their plugin instances keyed by path, see utils.state_store."""
+        state = {"active_playlist": self.active_playlist}
+        for playlist in self.playlists:
+            state.update(playlist.get_state())
+        return state
+
+    def apply_state(self, state):
+        """Restores runtime state returned by `get_state()`."""
+        self.active_playlist = state.get("active_playlist", self.active_playlist)
+        for playlist in self.playlists:
+            playlist.apply_state(state)
 
     @classmethod
     def from_dict(cls, data):
@@ -175,12 +234,40 @@ class Playlist:
         current_plugin_index (int): Index of the currently active plugin in the playlist.
     """
 
+    __slots__ = ("name", "_start_time", "_end_time", "_time_range_minutes", "plugins", "plugins_by_key", "current_plugin_index")
+
     def __init__(self, name, start_time, end_time, plugins=None, current_plugin_index=None):
         self.name = name
+        self._time_range_minutes = None
         self.start_time = start_time
         self.end_time = end_time
         self.plugins = [PluginInstance.from_dict(p) for p in (plugins or [])]
         self.current_plugin_index = current_plugin_index
+        self._reindex()
+
+    def _reindex(self):
+        """Rebuilds the plugin instance index keyed by (plugin_id, name)."""
+        self.plugins_by_key = {}
+        for plugin in self.plugins:
+            self.plugins_by_key.setdefault((plugin.plugin_id, plugin.name), plugin)
+
+    @property
+    def start_time(self):
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, value):
+        self._start_time = value
+        self._time_range_minutes = None
+
+    @property
+    def end_time(self):
+        return self._end_time
+
+    @end_time.setter
+    def end_time(self, value):
+        self._end_time = value
+        self._time_range_minutes = None
 
     def is_active(self, current_time):
         """Check if the playlist is active at the given time."""
@@ -196,7 +283,9 @@ class Playlist:
         if self.find_plugin(plugin_data["plugin_id"], plugin_data["name"]):
             logger.warning(f"Plugin '{plugin_data['plugin_id']}' with instance '{plugin_data['name']}' already exists.")
             return False
-        self.plugins.append(PluginInstance.from_dict(plugin_data))
+        plugin = PluginInstance.from_dict(plugin_data)
+        self.plugins.append(plugin)
+        self.plugins_by_key[(plugin.plugin_id, plugin.name)] = plugin
         return True
 
     def update_plugin(self, plugin_id, instance_name, updated_data):
@@ -204,6 +293,8 @@ class Playlist:
         plugin = self.find_plugin(plugin_id, instance_name)
         if plugin:
             plugin.update(updated_data)
+            # the update may rename the instance
+            self._reindex()
             return True
         logger.warning(f"Plugin '{plugin_id}' with name '{instance_name}' not found.")
         return False
@@ -212,7 +303,8 @@ class Playlist:
         """Remove a specific plugin instance from the playlist."""
         initial_count = len(self.plugins)
         self.plugins = [p for p in self.plugins if not (p.plugin_id == plugin_id and p.name == name)]
-        
+        self._reindex()
+
         if len(self.plugins) == initial_count:
             logger.warning(f"Plugin '{plugin_id}' with instance '{name}' not found.")
             return False
@@ -220,45 +312,75 @@ class Playlist:
 
     def find_plugin(self, plugin_id, name):
         """Find a plugin instance by its plugin_id and name."""
-        return next((p for p in self.plugins if p.plugin_id == plugin_id and p.name == name), None)
+        return self.plugins_by_key.get((plugin_id, name))
 
     def get_next_plugin(self):
         """Returns the next plugin instance in the playlist and update the current_plugin_index."""
-        if self.current_plugin_index is None:
-            self.current_plugin_index = 0
-        else:
-            self.current_plugin_index = (self.current_plugin_index + 1) % len(self.plugins)
-        
+        self.current_plugin_index = self._next_plugin_index()
         return self.plugins[self.current_plugin_index]
 
+    def peek_next_plugin(self):
+        """Returns the next plugin instance in the playlist without advancing the current_plugin_index."""
+        if not self.plugins:
+            return None
+        return self.plugins[self._next_plugin_index()]
+
+    def _next_plugin_index(self):
+        """Returns the index of the plugin that follows the current_plugin_index."""
+        if self.current_plugin_index is None:
+            return 0
+        return (self.current_plugin_index + 1) % len(self.plugins)
+
     def get_priority(self):
         """Determine priority of a playlist, based on the time range"""
         return self.get_time_range_minutes()
 
-    def get_time_range_minutes(self):
-        """Calculate the time difference in minutes between start_time and end_time."""
-        start = datetime.strptime(self.start_time, "%H:%M")
-        # Handle '24:00' by converting it to '00:00' of the next day
-        if self.end_time != "24:00":
-            end = datetime.strptime(self.end_time, "%H:%M")
-        else:
-            end = datetime.strptime("00:00", "%H:%M")
-            end += timedelta(days=1)
-
-        # If the window wraps past midnight (EG: 21:00 -> 03:00), treat end as next day
-        if end < start:
-            end += timedelta(days=1)
-            
-        return int((end - start).total_seconds() // 60)
+    @staticmethod
+    def to_minutes(time_str):
+        """Converts an 'HH:MM' time, including '24:00', to minutes since midnight."""
+        hours, minutes = time_str.split(":")
+        return int(hours) * 60 + int(minutes)
 
-    def to_dict(self):
-        return {
+    def get_time_range_minutes(self):
+        """Calculate the time difference in minutes between start_time and end_time, cached until either changes."""
+        if self._time_range_minutes is None:
+            start = self.to_minutes(self.start_time)
+            end = self.to_minutes(self.end_time)
+            # If the window wraps past midnight (EG: 21:00 -> 03:00), treat end as next day
+            if end < start:
+                end += 24 * 60
+            self._time_range_minutes = end - start
+        return self._time_range_minutes
+
+    def to_dict(self, include_state=True):
+        playlist_dict = {
             "name": self.name,
             "start_time": self.start_time,
             "end_time": self.end_time,
-            "plugins": [p.to_dict() for p in self.plugins],
-            "current_plugin_index": self.current_plugin_index
+            "plugins": [p.to_dict(include_state) for p in self.plugins],
         }
+        if include_state:
+            playlist_dict["current_plugin_index"] = self.current_plugin_index
+        return playlist_dict
+
+    def get_state(self):
+        """Returns the runtime state of the playlist and its plugin instances keyed by path."""
+        prefix = f"playlist/{self.name}"
+        state = {f"{prefix}/current_plugin_index": self.current_plugin_index}
+        for plugin in self.plugins:
+            state[f"{prefix}/plugin/{plugin.plugin_id}/{plugin.name}"] = plugin.get_state()
+        return state
+
+    def apply_state(self, state):
+        """Restores the runtime state of the playlist and its plugin instances."""
+        prefix = f"playlist/{self.name}"
+        self.current_plugin_index = state.get(f"{prefix}/current_plugin_index", self.current_plugin_index)
+        if self.current_plugin_index is not None and self.current_plugin_index >= len(self.plugins):
+            self.current_plugin_index = None
+        for plugin in self.plugins:
+            plugin_state = state.get(f"{prefix}/plugin/{plugin.plugin_id}/{plugin.name}")
+            if plugin_state:
+                plugin.apply_state(plugin_state)
 
     @classmethod
     def from_dict(cls, data):
@@ -279,20 +401,51 @@ class PluginInstance:
         settings (dict): Settings associated with the plugin.
         refresh (dict): Refresh settings, such as interval and scheduled time.
         latest_refresh (str): ISO-formatted string representing the last refresh time.
+        data_fingerprint (str): Fingerprint of the data the latest image was generated from.
     """
 
-    def __init__(self, plugin_id, name, settings, refresh, latest_refresh_time=None):
+    # Settings written back by plugins on each refresh, kept as runtime state rather than configuration
+    STATE_SETTINGS = ("image_index",)
+
+    __slots__ = ("plugin_id", "name", "settings", "_refresh", "_scheduled_time", "_latest_refresh_time", "_latest_refresh_dt", "data_fingerprint")
+
+    def __init__(self, plugin_id, name, settings, refresh, latest_refresh_time=None, data_fingerprint=None):
         self.plugin_id = plugin_id
         self.name = name
         self.settings = settings
         self.refresh = refresh
         self.latest_refresh_time = latest_refresh_time
+        self.data_fingerprint = data_fingerprint
+
+    @property
+    def refresh(self):
+        return self._refresh
+
+    @refresh.setter
+    def refresh(self, value):
+        self._refresh = value
+        self._scheduled_time = None
+
+    @property
+    def latest_refresh_time(self):
+        return self._latest_refresh_time
+
+    @latest_refresh_time.setter
+    def latest_refresh_time(self, value):
+        self._latest_refresh_time = value
+        self._latest_refresh_dt = None
 
     def update(self, updated_data):
         """Update attributes of the class with the dictionary values."""
         for key, value in updated_data.items():
             setattr(self, key, value)
 
+    def get_scheduled_time(self):
+        """Returns the scheduled refresh time of day, or None if the refresh is not scheduled, parsed once per value."""
+        if self._scheduled_time is None and self.refresh.get("scheduled"):
+            self._scheduled_time = parse_time(self.refresh["scheduled"])
+        return self._scheduled_time
+
     def should_refresh(self, current_time):
         """Checks whether the plugin should be refreshed based on its refresh settings and the current time."""
         latest_refresh_dt = self.get_latest_refresh_dt()
@@ -300,24 +453,17 @@ class PluginInstance:
             return True
 
         # Check for interval-based refresh
-        if "interval" in self.refresh:
-            interval = self.refresh.get("interval")
-            if interval and (current_time - latest_refresh_dt) >= timedelta(seconds=interval):
-                return True
+        interval = self.refresh.get("interval")
+        if interval and (current_time - latest_refresh_dt) >= timedelta(seconds=interval):
+            return True
 
         # Check for scheduled refresh (HH:MM format)
-        if "scheduled" in self.refresh:
-            scheduled_time_str = self.refresh.get("scheduled")
-            latest_refresh_str = latest_refresh_dt.strftime("%H:%M")
-
+        scheduled_time = self.get_scheduled_time()
+        if scheduled_time:
             # If the latest refresh is before the scheduled time today
-            if latest_refresh_str < scheduled_time_str:
+            if (latest_refresh_dt.hour, latest_refresh_dt.minute) < (scheduled_time.hour, scheduled_time.minute):
                 return True
-        
-        if "scheduled" in self.refresh:
-            scheduled_time_str = self.refresh.get("scheduled")
-            scheduled_time = datetime.strptime(scheduled_time_str, "%H:%M").time()
-            
+
             latest_refresh_date = latest_refresh_dt.date()
             current_date = current_time.date()
 
@@ -328,26 +474,56 @@ class PluginInstance:
 
         return False
 
+    def get_next_scheduled_dt(self):
+        """Returns when the scheduled ('HH:MM') refresh following the latest refresh is due, or None if
+        the instance has no scheduled refresh or was never refreshed."""
+        latest_refresh_dt = self.get_latest_refresh_dt()
+        scheduled_time = self.get_scheduled_time()
+        if not scheduled_time or not latest_refresh_dt:
+            return None
+        return next_occurrence(scheduled_time, latest_refresh_dt)
+
     def get_image_path(self):
         """Formats the image path for this plugin instance."""
         return f"{self.plugin_id}_{self.name.replace(' ', '_')}.png"
 
     def get_latest_refresh_dt(self):
-        """Returns the latest refresh time as a datetime object, or None if not set."""
-        latest_refresh = None
-        if self.latest_refresh_time:
-            latest_refresh = datetime.fromisoformat(self.latest_refresh_time)
-        return latest_refresh
-    
-    def to_dict(self):
+        """Returns the latest refresh time as a datetime object, or None if not set, parsed once per value."""
+        if self._latest_refresh_dt is None and self._latest_refresh_time:
+            self._latest_refresh_dt = datetime.fromisoformat(self._latest_refresh_time)
+        return self._latest_refresh_dt
+
+    def to_dict(self, include_state=True):
+        if include_state:
+            return {
+                "plugin_id": self.plugin_id,
+                "name": self.name,
+                "plugin_settings": self.settings,
+                "refresh": self.refresh,
+                "latest_refresh_time": self.latest_refresh_time,
+                "data_fingerprint": self.data_fingerprint,
+            }
         return {
             "plugin_id": self.plugin_id,
             "name": self.name,
-            "plugin_settings": self.settings,
+            "plugin_settings": {k: v for k, v in self.settings.items() if k not in self.STATE_SETTINGS},
             "refresh": self.refresh,
+        }
+
+    def get_state(self):
+        """Returns the runtime state of the plugin instance."""
+        return {
             "latest_refresh_time": self.latest_refresh_time,
+            "data_fingerprint": self.data_fingerprint,
+            "settings": {k: self.settings[k] for k in self.STATE_SETTINGS if k in self.settings},
         }
 
+    def apply_state(self, state):
+        """Restores runtime state returned by `get_state()`."""
+        self.latest_refresh_time = state.get("latest_refresh_time", self.latest_refresh_time)
+        self.data_fingerprint = state.get("data_fingerprint", self.data_fingerprint)
+        self.settings.update(state.get("settings", {}))
+
     @classmethod
     def from_dict(cls, data):
         return cls(
@@ -356,4 +532,5 @@ class PluginInstance:
             settings=data["plugin_settings"],
             refresh=data["refresh"],
             latest_refresh_time=data.get("latest_refresh_time"),
+            data_fingerprint=data.get("data_fingerprint"),
         )
\ No newline at end of file
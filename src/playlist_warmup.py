@@ -0,0 +1,132 @@
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from plugins.plugin_registry import get_plugin_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT_SECONDS = 60
+DEFAULT_MAX_SECONDS = 120
+
+class PlaylistWarmup:
+    """Regenerates the stale plugin instances of a playlist concurrently.
+
+    After a reboot or a long gap between playlist windows every plugin instance of the active
+    playlist is stale. Instead of regenerating one per plugin cycle, the refresh task warms them all
+    up at once on a bounded thread pool. Browser renders are still limited separately, see
+    `utils.image_utils.set_render_concurrency`.
+
+    The warm-up gives way to manual refreshes: `should_stop` is checked between completed renders and
+    ends it early. Renders that time out, and renders still running when it ends, are abandoned and
+    discard their image instead of updating the plugin instance. The warm-up runs on the refresh
+    thread, so its total duration is capped by `max_seconds`.
+
+    Configured by the "warmup" device setting:
+        enabled (bool): Whether to warm up playlists, defaults to True.
+        workers (int): Size of the thread pool, defaults to 2.
+        timeout_seconds (int): Seconds a plugin may take before it is given up on, defaults to 60.
+        plugin_timeouts (dict): Timeouts overriding `timeout_seconds`, keyed by plugin id.
+        max_seconds (int): Seconds the whole warm-up may take, defaults to 120.
+    """
+
+    def __init__(self, device_config):
+        self.device_config = device_config
+
+    def get_stale_instances(self, playlist, current_dt):
+        """Returns the plugin instances of the playlist that are due for a refresh or have no image."""
+        stale = []
+        for plugin_instance in playlist.plugins:
+            image_path = os.path.join(self.device_config.plugin_image_dir, plugin_instance.get_image_path())
+            if plugin_instance.should_refresh(current_dt) or not os.path.exists(image_path):
+                stale.append(plugin_instance)
+        return stale
+
+    def run(self, playlist, current_dt, should_stop=None):
+        """Refreshes the stale plugin instances of the playlist, when more than one is stale.
+
+        Args:
+            playlist (Playlist): Playlist to warm up.
+            current_dt (datetime): Current time in the device timezone.
+            should_stop (callable, optional): Returns True when the warm-up should end early.
+
+        Returns:
+            list: Names of the plugin instances that were refreshed.
+        """
+        config = self.device_config.get_config("warmup")
+        if not config.get("enabled", True):
+            return []
+
+        stale = self.get_stale_instances(playlist, current_dt)
+        if len(stale) < 2:
+            # a single stale instance is refreshed as part of the normal cycle
+            return []
+
+        workers = max(1, int(config.get("workers", DEFAULT_WORKERS)))
+        logger.info(f"Warming up playlist. | playlist: {playlist.name} | stale_instances: {len(stale)} | workers: {workers}")
+
+        started = {}
+        # one event per instance, so an instance that times out is abandoned on its own
+        abandoned = {id(plugin_instance): threading.Event() for plugin_instance in stale}
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup")
+        futures = {
+            executor.submit(self._refresh_instance, playlist, plugin_instance, current_dt, started,
+                            abandoned[id(plugin_instance)]): plugin_instance
+            for plugin_instance in stale
+        }
+
+        # give up on everything once the slowest plugins could have run in turn on every worker,
+        # but never hold up the refresh loop for longer than max_seconds
+        longest_timeout = max(self._get_timeout(config, plugin_instance) for plugin_instance in stale)
+        max_seconds = float(config.get("max_seconds", DEFAULT_MAX_SECONDS))
+        deadline = time.monotonic() + min(longest_timeout * -(-len(stale) // workers), max_seconds)
+
+        refreshed = []
+        pending = set(futures)
+        while pending and time.monotonic() < deadline:
+            if should_stop and should_stop():
+                logger.info(f"Playlist warm-up stopped early. | playlist: {playlist.name} | remaining: {len(pending)}")
+                break
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                plugin_instance = futures[future]
+                if future.exception():
+                    logger.error(f"Warm-up failed. | plugin_instance: {plugin_instance.name} | error: {future.exception()}")
+                else:
+                    refreshed.append(plugin_instance.name)
+
+            for future in list(pending):
+                plugin_instance = futures[future]
+                start = started.get(id(plugin_instance))
+                if start and time.monotonic() - start > self._get_timeout(config, plugin_instance):
+                    logger.warning(f"Warm-up timed out, continuing without it. | plugin_instance: {plugin_instance.name}")
+                    abandoned[id(plugin_instance)].set()
+                    pending.discard(future)
+
+        # hanging plugins keep their thread until they return but discard their image, queued ones are dropped
+        for event in abandoned.values():
+            event.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.info(f"Playlist warm-up finished. | playlist: {playlist.name} | refreshed: {len(refreshed)}/{len(stale)}")
+        return refreshed
+
+    def _refresh_instance(self, playlist, plugin_instance, current_dt, started, abandoned):
+        # imported here as refresh_task imports this module
+        from refresh_task import PlaylistRefresh
+
+        started[id(plugin_instance)] = time.monotonic()
+        plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+        if plugin_config is None:
+            raise ValueError(f"Plugin config not found for '{plugin_instance.plugin_id}'.")
+        plugin = get_plugin_instance(plugin_config)
+        image_path = os.path.join(self.device_config.plugin_image_dir, plugin_instance.get_image_path())
+        # instances without an image are regenerated even if their refresh is not due
+        force = not os.path.exists(image_path)
+        PlaylistRefresh(playlist, plugin_instance, force=force, cancel_event=abandoned).execute(plugin, self.device_config, current_dt)
+
+    @staticmethod
+    def _get_timeout(config, plugin_instance):
+        plugin_timeouts = config.get("plugin_timeouts", {})
+        return float(plugin_timeouts.get(plugin_instance.plugin_id, config.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS)))
@@ -3,7 +3,7 @@ from openai import OpenAI
 from PIL import Image
 from io import BytesIO
 import base64
-import requests
+from utils.http_client import http_get
 import logging
 
 logger = logging.getLogger(__name__)
@@ -81,7 +81,7 @@ class AIImage(BasePlugin):
         response = ai_client.images.generate(**args)
         if model in ["dall-e-3", "dall-e-2"]:
             image_url = response.data[0].url
-            response = requests.get(image_url)
+            response = http_get(image_url)
             img = Image.open(BytesIO(response.content))
         elif model == "gpt-image-1":
             image_base64 = response.data[0].b64_json
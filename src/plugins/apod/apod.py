@@ -8,7 +8,7 @@ For the API key, set `NASA_SECRET={API_KEY}` in your .env file.
 from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image
 from io import BytesIO
-import requests
+from utils.http_client import http_get
 import logging
 from random import randint
 from datetime import datetime, timedelta
@@ -44,7 +44,7 @@ class Apod(BasePlugin):
         elif settings.get("customDate"):
             params["date"] = settings["customDate"]
 
-        response = requests.get("https://api.nasa.gov/planetary/apod", params=params)
+        response = http_get("https://api.nasa.gov/planetary/apod", params=params, ttl=60 * 60)
 
         if response.status_code != 200:
             logger.error(f"NASA API error: {response.text}")
@@ -58,7 +58,7 @@ class Apod(BasePlugin):
         image_url = data.get("hdurl") or data.get("url")
 
         try:
-            img_data = requests.get(image_url)
+            img_data = http_get(image_url)
             image = Image.open(BytesIO(img_data.content))
         except Exception as e:
             logger.error(f"Failed to load APOD image: {str(e)}")
@@ -2,6 +2,7 @@ import logging
 import os
 from utils.app_utils import resolve_path, get_fonts
 from utils.image_utils import take_screenshot_html
+from utils.render_cache import render_cache
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pathlib import Path
 import asyncio
@@ -39,17 +40,41 @@ class BasePlugin:
         self.config = config
 
         self.render_dir = self.get_plugin_dir("render")
-        if os.path.exists(self.render_dir):
+        self._env = None
+
+    @property
+    def env(self):
+        """Jinja2 environment for the plugin's templates, created on the first render."""
+        if self._env is None and os.path.exists(self.render_dir):
             # instantiate jinja2 env with base plugin and current plugin render directories
             loader = FileSystemLoader([self.render_dir, BASE_PLUGIN_RENDER_DIR])
-            self.env = Environment(
+            self._env = Environment(
                 loader=loader,
                 autoescape=select_autoescape(['html', 'xml'])
             )
+        return self._env
 
     def generate_image(self, settings, device_config):
         raise NotImplementedError("generate_image must be implemented by subclasses")
 
+    def get_data_fingerprint(self, settings, device_config):
+        """Optional hook that plugins can override to skip regenerating unchanged images.
+
+        Should cheaply return a value identifying the data the image is generated from, such as the
+        ETag of a feed or a hash of a downloaded file. When it matches the fingerprint of the latest
+        refresh of a playlist plugin instance, the latest image is reused instead of calling
+        `generate_image`. The instance settings, display resolution and orientation, timezone and
+        time format are taken into account separately and do not need to be part of the fingerprint.
+
+        Args:
+            settings: The plugin instance's settings dict.
+            device_config: The device configuration.
+
+        Returns:
+            A JSON serializable value, or None if the image should always be regenerated.
+        """
+        return None
+
     def cleanup(self, settings):
         """Optional cleanup method that plugins can override to delete associated resources.
 
@@ -93,8 +118,25 @@ class BasePlugin:
         template_params["font_faces"] = get_fonts()
         template_params["static_dir"] = STATIC_DIR
 
+        # reuse the screenshot of an identical earlier render
+        cache_key = None
+        if render_cache.enabled:
+            cache_key = render_cache.make_key(
+                f"{self.get_plugin_id()}/{html_file}",
+                [self.render_dir, BASE_PLUGIN_RENDER_DIR],
+                css_files,
+                template_params,
+                dimensions
+            )
+            image = render_cache.get(cache_key)
+            if image:
+                return image
+
         # load and render the given html template
         template = self.env.get_template(html_file)
         rendered_html = template.render(template_params)
 
-        return take_screenshot_html(rendered_html, dimensions)
+        image = take_screenshot_html(rendered_html, dimensions)
+        if image and cache_key:
+            render_cache.put(cache_key, image)
+        return image
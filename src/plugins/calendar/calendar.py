@@ -7,13 +7,23 @@ import icalendar
 import recurring_ical_events
 from io import BytesIO
 import logging
-import requests
+from utils.http_client import http_get
+import hashlib
+import time
 from datetime import datetime, timedelta
 import pytz
 
 logger = logging.getLogger(__name__)
 
+# Seconds a calendar downloaded for the data fingerprint is reused when generating the image
+ICS_REUSE_SECONDS = 60
+
 class Calendar(BasePlugin):
+    def __init__(self, config, **dependencies):
+        super().__init__(config, **dependencies)
+        # calendars downloaded by get_data_fingerprint, keyed by url, so a refresh downloads them once
+        self._fetched_ics = {}
+
     def generate_settings_template(self):
         template_params = super().generate_settings_template()
         template_params['style_settings'] = True
@@ -70,6 +80,23 @@ class Calendar(BasePlugin):
             raise RuntimeError("Failed to take screenshot, please check logs.")
         return image
     
+    def get_data_fingerprint(self, settings, device_config):
+        calendar_urls = settings.get('calendarURLs[]')
+        if not calendar_urls:
+            return None
+
+        # the rendered view moves with the current hour
+        timezone = device_config.get_config("timezone", default="America/New_York")
+        current_dt = datetime.now(pytz.timezone(timezone)).replace(minute=0, second=0, microsecond=0)
+
+        ics_hashes = []
+        for calendar_url in calendar_urls:
+            response = http_get(calendar_url)
+            response.raise_for_status()
+            self._fetched_ics[calendar_url] = (time.monotonic(), response.text)
+            ics_hashes.append(hashlib.sha256(response.content).hexdigest())
+        return [current_dt.isoformat(), ics_hashes]
+
     def fetch_ics_events(self, calendar_urls, colors, tz, start_range, end_range):
         parsed_events = []
 
@@ -146,9 +173,12 @@ class Calendar(BasePlugin):
 
     def fetch_calendar(self, calendar_url):
         try:
-            response = requests.get(calendar_url)
-            response.raise_for_status()
-            return icalendar.Calendar.from_ical(response.text)
+            fetched_at, ics = self._fetched_ics.pop(calendar_url, (None, None))
+            if fetched_at is None or time.monotonic() - fetched_at > ICS_REUSE_SECONDS:
+                response = http_get(calendar_url)
+                response.raise_for_status()
+                ics = response.text
+            return icalendar.Calendar.from_ical(ics)
         except Exception as e:
             raise RuntimeError(f"Failed to fetch iCalendar url: {str(e)}")
 
@@ -1,10 +1,11 @@
 from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image, ImageDraw, ImageFont
+from io import BytesIO
 
-import requests
+from utils.http_client import http_get
 
 from .comic_parser import COMICS, get_panel
-from utils.app_utils import get_font
+from utils.app_utils import get_font, get_text_bbox
 
 class Comic(BasePlugin):
     def generate_settings_template(self):
@@ -30,25 +31,26 @@ class Comic(BasePlugin):
         return self._compose_image(comic_panel, is_caption, caption_font_size, width, height)
 
     def _compose_image(self, comic_panel, is_caption, caption_font_size, width, height):
-        response = requests.get(comic_panel["image_url"], stream=True)
+        response = http_get(comic_panel["image_url"])
         response.raise_for_status()
 
-        with Image.open(response.raw) as img:
+        with Image.open(BytesIO(response.content)) as img:
             background = Image.new("RGB", (width, height), "white")
-            font = get_font("Jost", font_size=int(caption_font_size))
+            font_size = int(caption_font_size)
+            font = get_font("Jost", font_size=font_size)
             draw = ImageDraw.Draw(background)
             top_padding, bottom_padding = 0, 0
 
             if is_caption:
                 if comic_panel["title"]:
-                    lines, wrapped_text = self._wrap_text(comic_panel["title"], font, width)
+                    lines, wrapped_text = self._wrap_text(comic_panel["title"], font_size, width)
                     draw.multiline_text((width // 2, 0), wrapped_text, font=font, fill="black", anchor="ma")
-                    top_padding = font.getbbox(wrapped_text)[3] * lines + 1
+                    top_padding = get_text_bbox(wrapped_text, "Jost", font_size)[3] * lines + 1
 
                 if comic_panel["caption"]:
-                    lines, wrapped_text = self._wrap_text(comic_panel["caption"], font, width)
+                    lines, wrapped_text = self._wrap_text(comic_panel["caption"], font_size, width)
                     draw.multiline_text((width // 2, height), wrapped_text, font=font, fill="black", anchor="md")
-                    bottom_padding = font.getbbox(wrapped_text)[3] * lines + 1
+                    bottom_padding = get_text_bbox(wrapped_text, "Jost", font_size)[3] * lines + 1
 
             scale = min(width / img.width, (height - top_padding - bottom_padding) / img.height)
             new_size = (int(img.width * scale), int(img.height * scale))
@@ -65,13 +67,13 @@ class Comic(BasePlugin):
 
             return background
 
-    def _wrap_text(self, text, font, width):
+    def _wrap_text(self, text, font_size, width):
         lines = []
         words = text.split()[::-1]
 
         while words:
             line = words.pop()
-            while words and font.getbbox(line + ' ' + words[-1])[2] < width:
+            while words and get_text_bbox(line + ' ' + words[-1], "Jost", font_size)[2] < width:
                 line += ' ' + words.pop()
             lines.append(line)
 
@@ -1,6 +1,7 @@
 import feedparser
 import html
 import re
+from utils.http_client import http_get
 
 
 COMICS = {
@@ -64,7 +65,7 @@ COMICS = {
 
 
 def get_panel(comic_name):
-    feed = feedparser.parse(COMICS[comic_name]["feed"])
+    feed = feedparser.parse(http_get(COMICS[comic_name]["feed"], cache=True).content)
     try:
         element = COMICS[comic_name]["element"](feed)
     except IndexError:
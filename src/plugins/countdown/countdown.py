@@ -41,4 +41,9 @@ class Countdown(BasePlugin):
         }
 
         image = self.render_image(dimensions, "countdown.html", "countdown.css", template_params)
-        return image
\ No newline at end of file
+        return image
+
+    def get_data_fingerprint(self, settings, device_config):
+        # the day count only changes with the date
+        timezone = device_config.get_config("timezone", default="America/New_York")
+        return datetime.now(pytz.timezone(timezone)).date().isoformat()
\ No newline at end of file
@@ -1,5 +1,5 @@
 import logging
-import requests
+from utils.http_client import http_get
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +39,7 @@ def fetch_stars(github_repository):
     url = f"https://api.github.com/repos/{github_repository}"
     headers = {"Accept": "application/json"}
 
-    response = requests.get(url, headers=headers)
+    response = http_get(url, headers=headers)
     if response.status_code == 200:
         data = response.json()
     else:
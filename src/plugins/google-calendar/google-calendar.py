@@ -8,7 +8,7 @@ import icalendar
 import recurring_ical_events
 from io import BytesIO
 import logging
-import requests
+from utils.http_client import http_get
 from datetime import datetime, timedelta
 import pytz
 
@@ -167,7 +167,7 @@ class GoogleCalendar(BasePlugin):
                     calendar_url = f"https://calendar.google.com/calendar/ical/{urllib.parse.quote(calendar_id)}/public/basic.ics"
                     logger.info(f"Transformed Google Calendar URL to: {calendar_url}")
 
-            response = requests.get(calendar_url)
+            response = http_get(calendar_url)
             response.raise_for_status()
             return icalendar.Calendar.from_ical(response.text)
         except Exception as e:
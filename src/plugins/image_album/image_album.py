@@ -1,7 +1,7 @@
 import logging
 from random import choice, random
 
-import requests
+from utils.http_client import http_get
 from PIL import Image, ImageColor, ImageOps
 from io import BytesIO
 
@@ -21,7 +21,7 @@ class ImmichProvider:
         self.headers = {"x-api-key": self.key}
 
     def get_album_data(self, album_name: str) -> dict:
-        r = requests.get(f"{self.base_url}/api/albums", headers=self.headers)
+        r = http_get(f"{self.base_url}/api/albums", headers=self.headers)
         r.raise_for_status()
         albums = r.json()
         album_summary = [a for a in albums if a["albumName"] == album_name][0]
@@ -30,7 +30,7 @@ class ImmichProvider:
             raise RuntimeError(f"Album {album_name} not found.")
 
         album_id = album_summary["id"]
-        r2 = requests.get(f"{self.base_url}/api/albums/{album_id}", headers=self.headers)
+        r2 = http_get(f"{self.base_url}/api/albums/{album_id}", headers=self.headers)
         r2.raise_for_status()
         
         return r2.json()
@@ -50,7 +50,7 @@ class ImmichProvider:
         asset_id = choice(asset_ids)
 
         logger.info(f"Downloading image {asset_id}")
-        r = requests.get(f"{self.base_url}/api/assets/{asset_id}/original", headers=self.headers)
+        r = http_get(f"{self.base_url}/api/assets/{asset_id}/original", headers=self.headers)
         r.raise_for_status()
         img = Image.open(BytesIO(r.content))
         img = ImageOps.exif_transpose(img)
@@ -3,14 +3,32 @@
 import os
 import importlib
 import logging
+import threading
+import time
 from utils.app_utils import resolve_path
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 PLUGINS_DIR = 'plugins'
+
+# Instantiated plugins by id, filled in on first use by `get_plugin_instance`
 PLUGIN_CLASSES = {}
 
+# Plugins that can be loaded by id, as (module name, plugin config), see `load_plugins`
+PLUGIN_MODULES = {}
+
+# Plugins that failed to load by id, as the error message, they are not retried until restart
+PLUGIN_ERRORS = {}
+
+# Serializes the import of each plugin, so a plugin requested while it is being warmed up is imported once
+_plugin_locks = {}
+
 def load_plugins(plugins_config):
+    """Registers the enabled plugins without importing them.
+
+    Plugin modules pull in heavy dependencies (e.g. openai, icalendar, NumPy) that most devices never
+    use, so a plugin is only imported and instantiated the first time `get_plugin_instance` asks for it.
+    """
     plugins_module_path = Path(resolve_path(PLUGINS_DIR))
     for plugin in plugins_config:
         plugin_id = plugin.get('id')
@@ -28,25 +46,64 @@ def load_plugins(plugins_config):
             logging.error(f"Could not find module path {module_path} for '{plugin_id}', skipping.")
             continue
 
-        module_name = f"plugins.{plugin_id}.{plugin_id}"
+        PLUGIN_MODULES[plugin_id] = (f"plugins.{plugin_id}.{plugin_id}", plugin)
+        _plugin_locks.setdefault(plugin_id, threading.Lock())
+
+def _load_plugin(plugin_id):
+    """Imports and instantiates a registered plugin, returns None if it can't be loaded."""
+    module_name, plugin = PLUGIN_MODULES[plugin_id]
+    with _plugin_locks[plugin_id]:
+        if plugin_id in PLUGIN_CLASSES:
+            return PLUGIN_CLASSES[plugin_id]
+        if plugin_id in PLUGIN_ERRORS:
+            return None
+
+        start = time.perf_counter()
         try:
             module = importlib.import_module(module_name)
-            plugin_class = getattr(module, plugin.get("class"), None)
+        except ImportError as e:
+            PLUGIN_ERRORS[plugin_id] = f"Failed to import plugin module {module_name}: {e}"
+            logging.error(PLUGIN_ERRORS[plugin_id])
+            return None
 
-            if plugin_class:
-                # Create an instance of the plugin class and add it to the plugin_classes dictionary
-                PLUGIN_CLASSES[plugin_id] = plugin_class(plugin)
+        plugin_class = getattr(module, plugin.get("class"), None)
+        if not plugin_class:
+            PLUGIN_ERRORS[plugin_id] = f"Plugin class {plugin.get('class')} not found in {module_name}"
+            logging.error(PLUGIN_ERRORS[plugin_id])
+            return None
 
-        except ImportError as e:
-            logging.error(f"Failed to import plugin module {module_name}: {e}")
+        # Create an instance of the plugin class and add it to the plugin_classes dictionary
+        PLUGIN_CLASSES[plugin_id] = plugin_class(plugin)
+        logger.info(f"Loaded plugin {plugin_id} in {time.perf_counter() - start:.2f}s")
+        return PLUGIN_CLASSES[plugin_id]
+
+def warm_up_plugins(plugin_ids):
+    """Loads the given plugins on a background thread, so their first refresh doesn't wait on the import."""
+    plugin_ids = [plugin_id for plugin_id in dict.fromkeys(plugin_ids)
+                  if plugin_id in PLUGIN_MODULES and plugin_id not in PLUGIN_CLASSES and plugin_id not in PLUGIN_ERRORS]
+    if not plugin_ids:
+        return None
+
+    def _warm_up():
+        for plugin_id in plugin_ids:
+            _load_plugin(plugin_id)
+
+    logger.info(f"Warming up plugins: {', '.join(plugin_ids)}")
+    thread = threading.Thread(target=_warm_up, name="plugin-warmup", daemon=True)
+    thread.start()
+    return thread
 
 def get_plugin_instance(plugin_config):
     plugin_id = plugin_config.get("id")
-    # Retrieve the plugin class factory function
+    # Retrieve the plugin instance, importing the plugin on first use
     plugin_class = PLUGIN_CLASSES.get(plugin_id)
-    
+    if not plugin_class and plugin_id in PLUGIN_MODULES and plugin_id not in PLUGIN_ERRORS:
+        plugin_class = _load_plugin(plugin_id)
+
     if plugin_class:
         # Initialize the plugin with its configuration
         return plugin_class
+    elif plugin_id in PLUGIN_ERRORS:
+        raise ValueError(f"Plugin '{plugin_id}' failed to load: {PLUGIN_ERRORS[plugin_id]}")
     else:
-        raise ValueError(f"Plugin '{plugin_id}' is not registered.")
\ No newline at end of file
+        raise ValueError(f"Plugin '{plugin_id}' is not registered.")
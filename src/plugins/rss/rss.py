@@ -2,9 +2,10 @@ from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image
 from io import BytesIO
 import feedparser
-import requests
+from utils.http_client import http_get, http_head
 import logging
 import html
+import hashlib
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +46,23 @@ class Rss(BasePlugin):
         image = self.render_image(dimensions, "rss.html", "rss.css", template_params)
         return image
     
+    def get_data_fingerprint(self, settings, device_config):
+        feed_url = settings.get("feedUrl")
+        if not feed_url:
+            return None
+
+        # prefer the validators of the feed over downloading it
+        headers = {"User-Agent": "Mozilla/5.0"}
+        resp = http_head(feed_url, timeout=10, headers=headers, allow_redirects=True)
+        if resp.ok and (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+            return [resp.headers.get("ETag"), resp.headers.get("Last-Modified")]
+
+        resp = http_get(feed_url, timeout=10, headers=headers)
+        resp.raise_for_status()
+        return hashlib.sha256(resp.content).hexdigest()
+
     def parse_rss_feed(self, url, timeout=10):
-        resp = requests.get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"})
+        resp = http_get(url, timeout=timeout, headers={"User-Agent": "Mozilla/5.0"}, cache=True)
         resp.raise_for_status()
         
         # Parse the feed content
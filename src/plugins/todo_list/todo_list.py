@@ -42,4 +42,8 @@ class TodoList(BasePlugin):
         }
         
         image = self.render_image(dimensions, "todo_list.html", "todo_list.css", template_params)
-        return image
\ No newline at end of file
+        return image
+
+    def get_data_fingerprint(self, settings, device_config):
+        # the lists are part of the settings, nothing else changes the image
+        return "settings"
\ No newline at end of file
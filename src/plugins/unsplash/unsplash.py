@@ -2,6 +2,7 @@ from plugins.base_plugin.base_plugin import BasePlugin
 from PIL import Image
 from io import BytesIO
 import requests
+from utils.http_client import http_get
 import logging
 import random
 
@@ -10,7 +11,7 @@ logger = logging.getLogger(__name__)
 def grab_image(image_url, dimensions, timeout_ms=40000):
     """Grab an image from a URL and resize it to the specified dimensions."""
     try:
-        response = requests.get(image_url, timeout=timeout_ms / 1000)
+        response = http_get(image_url, timeout=timeout_ms / 1000)
         response.raise_for_status()
         img = Image.open(BytesIO(response.content))
         img = img.resize(dimensions, Image.LANCZOS)
@@ -51,7 +52,7 @@ class Unsplash(BasePlugin):
             params['orientation'] = orientation
 
         try:
-            response = requests.get(url, params=params)
+            response = http_get(url, params=params)
             response.raise_for_status()
             data = response.json()
             if search_query:
@@ -15,7 +15,19 @@ class YearProgress(BasePlugin):
         dimensions = device_config.get_resolution()
         if device_config.get_config("orientation") == "vertical":
             dimensions = dimensions[::-1]
+
+        template_params = {
+            **self.get_year_progress(device_config),
+            "plugin_settings": settings
+        }
         
+        image = self.render_image(dimensions, "year_progress.html", "year_progress.css", template_params)
+        return image
+
+    def get_data_fingerprint(self, settings, device_config):
+        return self.get_year_progress(device_config)
+
+    def get_year_progress(self, device_config):
         timezone = device_config.get_config("timezone", default="America/New_York")
         tz = pytz.timezone(timezone)
         current_time = datetime.now(tz)
@@ -27,12 +39,8 @@ class YearProgress(BasePlugin):
         days_left = (start_of_next_year - current_time).total_seconds() / (24 * 3600)
         elapsed_days = (current_time - start_of_year).total_seconds() / (24 * 3600)
 
-        template_params = {
+        return {
             "year": current_time.year,
             "year_percent": round((elapsed_days / total_days) * 100),
-            "days_left": round(days_left),
-            "plugin_settings": settings
-        }
-        
-        image = self.render_image(dimensions, "year_progress.html", "year_progress.css", template_params)
-        return image
\ No newline at end of file
+            "days_left": round(days_left)
+        }
\ No newline at end of file
@@ -0,0 +1,234 @@
+import heapq
+import itertools
+import threading
+import time
+import uuid
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Number of finished jobs kept so their status can still be queried
+MAX_FINISHED_JOBS = 50
+
+# Refresh priorities, lower values run first
+PRIORITY_BUTTON = 0
+PRIORITY_WEB = 1
+PRIORITY_SCHEDULED = 2
+
+DEFAULT_MAX_QUEUE_DEPTH = 10
+
+class RefreshJob:
+    """A refresh run by the refresh task.
+
+    Status moves from `queued` to `rendering`, `displaying` (skipped when the image is unchanged)
+    and finally `done` or `failed`. Jobs superseded by a newer request, or dropped from a full queue,
+    end as `cancelled`. The time each status was entered is recorded in `timings`.
+
+    Attributes:
+        id (str): Unique id of the job.
+        refresh_action (RefreshAction): The refresh to perform.
+        key (str): Identifies what the job refreshes, the latest request for a key wins.
+        signature (str): Identifies the exact request, identical requests share a job.
+        priority (int): Priority of the job, lower values run first.
+        status (str): Current status of the job.
+        error (str): Error message of a failed job.
+        exception (Exception): Exception raised by a failed job.
+        timings (dict): Unix time at which each status was entered.
+    """
+
+    QUEUED = "queued"
+    RENDERING = "rendering"
+    DISPLAYING = "displaying"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, refresh_action, priority=PRIORITY_WEB):
+        self.id = uuid.uuid4().hex[:12]
+        self.refresh_action = refresh_action
+        self.key = refresh_action.get_job_key()
+        self.signature = refresh_action.get_job_signature()
+        self.priority = priority
+        self.status = self.QUEUED
+        self.error = None
+        self.exception = None
+        self.timings = {self.QUEUED: time.time()}
+        self.condition = threading.Condition()
+        self.cancel_event = threading.Event()
+
+    def set_status(self, status, exception=None):
+        """Updates the job status and wakes anyone waiting on the job."""
+        with self.condition:
+            self.status = status
+            self.timings[status] = time.time()
+            if exception is not None:
+                self.exception = exception
+                self.error = str(exception)
+            self.condition.notify_all()
+        logger.info(f"Refresh job {self.status}. | job_id: {self.id} | key: {self.key}")
+
+    def is_finished(self):
+        """Returns True if the job is done, failed or cancelled."""
+        return self.status in (self.DONE, self.FAILED, self.CANCELLED)
+
+    def cancel(self, reason):
+        """Requests cancellation, a running job stops before updating the display."""
+        if not self.cancel_event.is_set():
+            logger.info(f"Cancelling refresh job. | job_id: {self.id} | reason: {reason}")
+            self.error = reason
+            self.cancel_event.set()
+
+    def is_cancelled(self):
+        """Returns True if cancellation was requested."""
+        return self.cancel_event.is_set()
+
+    def wait(self, timeout=None):
+        """Blocks until the job is finished, returns False if the timeout expired first."""
+        with self.condition:
+            return self.condition.wait_for(self.is_finished, timeout=timeout)
+
+    def wait_for_change(self, status, timeout=None):
+        """Blocks until the job status differs from `status` and returns the current status."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.status != status, timeout=timeout)
+            return self.status
+
+    def to_dict(self):
+        """Returns the job status and timings, including the seconds spent in each stage."""
+        durations = {}
+        stages = [self.QUEUED, self.RENDERING, self.DISPLAYING, self.status if self.is_finished() else self.DONE]
+        entered = [(stage, self.timings[stage]) for stage in stages if stage in self.timings]
+        for (stage, start), (_, end) in zip(entered, entered[1:]):
+            durations[f"{stage}_seconds"] = round(end - start, 3)
+        if self.is_finished():
+            durations["total_seconds"] = round(self.timings[self.status] - self.timings[self.QUEUED], 3)
+
+        return {
+            "job_id": self.id,
+            "key": self.key,
+            "status": self.status,
+            "priority": self.priority,
+            "error": self.error,
+            "timings": {**self.timings, **durations}
+        }
+
+class RefreshJobRegistry:
+    """Keeps the queued, running and recently finished refresh jobs by id."""
+
+    def __init__(self, max_finished=MAX_FINISHED_JOBS):
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.max_finished = max_finished
+
+    def add(self, job):
+        """Registers a job and forgets the oldest finished jobs beyond `max_finished`."""
+        with self.lock:
+            self.jobs[job.id] = job
+            finished = [job_id for job_id, existing in self.jobs.items() if existing.is_finished()]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self.jobs[job_id]
+
+    def get(self, job_id):
+        """Returns the job with the given id, or None."""
+        with self.lock:
+            return self.jobs.get(job_id)
+
+class RefreshQueue:
+    """Bounded priority queue of refresh jobs.
+
+    Jobs run by priority, then in submission order. A new request for a key that is already
+    queued replaces the queued request (the latest request wins) and keeps the job's place.
+    When the queue is full the oldest job of the lowest priority is dropped, unless the new
+    job has an even lower priority in which case it is rejected.
+
+    The queue is not thread safe, callers hold the refresh task's lock.
+    """
+
+    def __init__(self, max_depth=DEFAULT_MAX_QUEUE_DEPTH):
+        self.max_depth = max_depth
+        self.heap = []
+        self.counter = itertools.count()
+        self.metrics = {
+            "submitted": 0,
+            "coalesced": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "dropped": 0,
+            "max_depth_seen": 0,
+            "dequeued": 0,
+            "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0,
+            "last_wait_seconds": None,
+        }
+
+    def __len__(self):
+        return len(self.heap)
+
+    def find(self, key):
+        """Returns the queued job with the given key, or None."""
+        return next((job for _, _, job in self.heap if job.key == key), None)
+
+    def push(self, job):
+        """Queues a job and returns the job that will carry out the request.
+
+        This is the queued job for the same key when there is one, otherwise the new job. Jobs
+        dropped or rejected because the queue is full are marked as cancelled.
+        """
+        self.metrics["submitted"] += 1
+        existing = self.find(job.key)
+        if existing:
+            if existing.signature == job.signature:
+                self.metrics["deduplicated"] += 1
+            else:
+                self.metrics["coalesced"] += 1
+                existing.refresh_action = job.refresh_action
+                existing.signature = job.signature
+            if job.priority < existing.priority:
+                existing.priority = job.priority
+                self.heap = [(existing.priority if queued is existing else priority, seq, queued)
+                             for priority, seq, queued in self.heap]
+                heapq.heapify(self.heap)
+            return existing
+
+        if len(self.heap) >= self.max_depth:
+            _, _, worst = max(self.heap, key=lambda entry: (entry[0], -entry[1]))
+            if job.priority > worst.priority:
+                self.metrics["rejected"] += 1
+                job.error = "Refresh queue is full"
+                job.set_status(RefreshJob.CANCELLED)
+                return job
+            self.heap = [entry for entry in self.heap if entry[2] is not worst]
+            heapq.heapify(self.heap)
+            self.metrics["dropped"] += 1
+            worst.error = "Dropped from full refresh queue"
+            worst.set_status(RefreshJob.CANCELLED)
+
+        heapq.heappush(self.heap, (job.priority, next(self.counter), job))
+        self.metrics["max_depth_seen"] = max(self.metrics["max_depth_seen"], len(self.heap))
+        return job
+
+    def pop(self):
+        """Removes and returns the next job to run, recording how long it waited."""
+        _, _, job = heapq.heappop(self.heap)
+        wait_seconds = time.time() - job.timings[RefreshJob.QUEUED]
+        self.metrics["dequeued"] += 1
+        self.metrics["total_wait_seconds"] += wait_seconds
+        self.metrics["max_wait_seconds"] = max(self.metrics["max_wait_seconds"], wait_seconds)
+        self.metrics["last_wait_seconds"] = wait_seconds
+        return job
+
+    def clear(self):
+        """Removes and returns all queued jobs."""
+        jobs = [job for _, _, job in sorted(self.heap)]
+        self.heap = []
+        return jobs
+
+    def get_metrics(self):
+        """Returns the queue depth, request counters and wait times."""
+        metrics = dict(self.metrics)
+        metrics["depth"] = len(self.heap)
+        metrics["max_depth"] = self.max_depth
+        metrics["average_wait_seconds"] = metrics["total_wait_seconds"] / metrics["dequeued"] if metrics["dequeued"] else None
+        metrics["queued_jobs"] = [job.to_dict() for _, _, job in sorted(self.heap)]
+        return metrics
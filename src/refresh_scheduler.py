@@ -0,0 +1,74 @@
+import heapq
+import logging
+from datetime import timedelta
+from model import next_occurrence
+
+logger = logging.getLogger(__name__)
+
+# Shortest sleep between two wake-ups, guards against spinning on an event that keeps firing
+MIN_SLEEP_SECONDS = 1
+
+class RefreshScheduler:
+    """Computes when the refresh task next has work to do.
+
+    Instead of waking every plugin cycle to re-check everything, the refresh task sleeps until the
+    earliest of these events:
+    - cycle: the plugin cycle interval has elapsed since the latest refresh.
+    - playlist: a playlist window opens or closes, so the active playlist may change.
+    - scheduled: the plugin instance on display has a scheduled ('HH:MM') refresh.
+
+    The sleep is capped at the plugin cycle interval, so a clock that jumps (e.g. NTP syncing after
+    boot on a Pi without an RTC) can't delay a refresh by more than one cycle.
+    """
+
+    CYCLE = "cycle"
+    PLAYLIST = "playlist"
+    SCHEDULED = "scheduled"
+
+    def __init__(self, device_config):
+        self.device_config = device_config
+
+    def get_events(self, current_dt, handled_dt=None):
+        """Returns a heap of (fire_dt, kind, detail) tuples of the upcoming events.
+
+        Events at or before `handled_dt`, the time of the latest refresh check, were already acted on,
+        e.g. a refresh that failed, and are left out so they aren't retried in a tight loop.
+        """
+        playlist_manager = self.device_config.get_playlist_manager()
+        latest_refresh = self.device_config.get_refresh_info()
+        events = []
+
+        playlist = playlist_manager.determine_active_playlist(current_dt)
+        if playlist and playlist.plugins:
+            latest_refresh_dt = latest_refresh.get_refresh_datetime()
+            cycle_interval = self.device_config.get_config("plugin_cycle_interval_seconds", default=3600)
+            cycle_dt = latest_refresh_dt + timedelta(seconds=cycle_interval) if latest_refresh_dt else current_dt
+            heapq.heappush(events, (cycle_dt, self.CYCLE, playlist.name))
+
+            # the instance on display, refreshed in place when its scheduled time arrives
+            if latest_refresh.playlist == playlist.name and latest_refresh.plugin_instance:
+                plugin_instance = playlist.find_plugin(latest_refresh.plugin_id, latest_refresh.plugin_instance)
+                scheduled_dt = plugin_instance.get_next_scheduled_dt() if plugin_instance else None
+                if scheduled_dt:
+                    heapq.heappush(events, (scheduled_dt, self.SCHEDULED, plugin_instance.name))
+
+        for other in playlist_manager.playlists:
+            for boundary in (other.start_time, other.end_time):
+                heapq.heappush(events, (next_occurrence(boundary, current_dt), self.PLAYLIST, other.name))
+
+        if handled_dt:
+            events = [event for event in events if event[0] > handled_dt]
+            heapq.heapify(events)
+        return events
+
+    def get_sleep_seconds(self, current_dt, handled_dt=None):
+        """Returns the seconds until the earliest upcoming event, see `get_events`."""
+        max_sleep = self.device_config.get_config("plugin_cycle_interval_seconds", default=3600)
+        events = self.get_events(current_dt, handled_dt)
+        if not events:
+            return max_sleep
+
+        fire_dt, kind, detail = events[0]
+        sleep_seconds = min(max((fire_dt - current_dt).total_seconds(), MIN_SLEEP_SECONDS), max_sleep)
+        logger.info(f"Next refresh check scheduled. | event: {kind} | detail: {detail} | time: {fire_dt.strftime('%Y-%m-%d %H:%M:%S')} | sleep: {sleep_seconds:.0f}s")
+        return sleep_seconds
@@ -1,13 +1,19 @@
 import threading
 import time
 import os
+import json
+import hashlib
 import logging
 import psutil
 import pytz
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from plugins.plugin_registry import get_plugin_instance
-from utils.image_utils import compute_image_hash
+from utils.change_detection import compute_image_hash, is_visually_identical
 from model import RefreshInfo, PlaylistManager
+from display.display_worker import DisplayWorker
+from playlist_warmup import PlaylistWarmup
+from refresh_scheduler import RefreshScheduler
+from refresh_jobs import RefreshJob, RefreshJobRegistry, RefreshQueue, PRIORITY_WEB, PRIORITY_SCHEDULED, DEFAULT_MAX_QUEUE_DEPTH
 from PIL import Image
 
 logger = logging.getLogger(__name__)
@@ -18,16 +24,26 @@ class RefreshTask:
     def __init__(self, device_config, display_manager):
         self.device_config = device_config
         self.display_manager = display_manager
+        self.display_worker = DisplayWorker(display_manager, on_idle=self._on_display_idle)
+        self.warmup = PlaylistWarmup(device_config)
+        self.scheduler = RefreshScheduler(device_config)
 
         self.thread = None
         self.lock = threading.Lock()
         self.condition = threading.Condition(self.lock)
         self.running = False
-        self.manual_update_request = ()
 
-        self.refresh_event = threading.Event()
-        self.refresh_event.set()
-        self.refresh_result = {}
+        # Manual refreshes waiting to run and the refresh in progress, see `submit_manual_update()`
+        self.manual_jobs = RefreshQueue(device_config.get_config("refresh_queue_size", default=DEFAULT_MAX_QUEUE_DEPTH))
+        self.jobs = RefreshJobRegistry()
+        self.active_job = None
+        self.cancelled_in_flight = 0
+
+        # Background prefetch of the next playlist plugin, see `_schedule_prefetch()`
+        self.prefetch_lock = threading.Lock()
+        self.prefetch_timer = None
+        self.prefetch_slot = None
+        self.prefetched = None
 
     def start(self):
         """Starts the background thread for refreshing the display."""
@@ -35,126 +51,343 @@ class RefreshTask:
             logger.info("Starting refresh task")
             self.thread = threading.Thread(target=self._run, daemon=True)
             self.running = True
+            self.display_worker.start()
             self.thread.start()
 
     def stop(self):
         """Stops the refresh task by notifying the background thread to exit."""
         with self.condition:
             self.running = False
+            pending_jobs = self.manual_jobs.clear()
             self.condition.notify_all()  # Wake the thread to let it exit
+        for job in pending_jobs:
+            job.set_status(RefreshJob.FAILED, exception=RuntimeError("Refresh task stopped"))
+        self._discard_prefetch()
         if self.thread:
             logger.info("Stopping refresh task")
             self.thread.join()
+        self.display_worker.stop()
 
     def _run(self):
         """Background task that manages the periodic refresh of the display.
 
-        This function runs in a loop, sleeping for a configured duration (`plugin_cycle_interval_seconds`) or until
-        manually triggered via `manual_update()`. Detrmines the next plugin to refresh based on active playlists and 
+        This function runs in a loop, sleeping until the next scheduled event (see `RefreshScheduler`) or until
+        manually triggered via `submit_manual_update()`. Detrmines the next plugin to refresh based on active playlists and 
         updates the display accordingly.
 
         Workflow:
-        1. Waits for the configured sleep duration or until notified of a manual update.
+        1. Waits until the next plugin cycle, playlist window boundary or scheduled plugin refresh, or until
+           notified of a manual update.
         2. Checks if a manual update has been requested:
         - If so, refreshes the specified plugin immediately.
         3. Otherwise, determines the next plugin to refresh based on the active playlist and generates an image.
-        4. Compares the image hash with the last displayed image hash.
-        - If the image has changed, updates the display.
+        4. Compares the hash of the post-processed frame with the last displayed one.
+        - If the image has changed, hands the frame to the display worker, which updates the panel while
+          the loop continues.
         - If the image is the same, skips the refresh.
         5. Updates the refresh metadata in the device configuration.
         6. Repeats the process until `stop()` is called.
 
-        Handles any exceptions that occur during the refresh process and ensures the refresh event is set 
-        to indicate completion.
+        Handles any exceptions that occur during the refresh process and marks the manual refresh job, if any,
+        as failed.
 
         Exceptions:
         - Captures and logs any unexpected errors during execution to prevent the thread from exiting.
         """
+        last_check_dt = None
         while True:
+            job = None
+            refresh_action = None
+            cancelled = False
             try:
                 with self.condition:
-                    sleep_time = self.device_config.get_config("plugin_cycle_interval_seconds", default=60*60)
-
-                    # Wait for sleep_time or until notified
-                    self.condition.wait(timeout=sleep_time)
-                    self.refresh_result = {}
-                    self.refresh_event.clear()
+                    # Wait for the next scheduled event or until notified, unless manual refreshes are already waiting.
+                    # While a frame is being displayed its refresh info is not saved yet, so scheduled checks wait
+                    # for the display worker to notify that it is idle.
+                    if not self.manual_jobs:
+                        sleep_time = None
+                        if self.display_worker.is_idle():
+                            sleep_time = self.scheduler.get_sleep_seconds(self._get_current_datetime(), last_check_dt)
+                        self.condition.wait(timeout=sleep_time)
 
                     # Exit if `stop()` is called
                     if not self.running:
                         break
 
-                    playlist_manager = self.device_config.get_playlist_manager()
-                    latest_refresh = self.device_config.get_refresh_info()
-                    current_dt = self._get_current_datetime()
-
-                    refresh_action = None
-                    if self.manual_update_request:
-                        # handle immediate update request
-                        logger.info("Manual update requested")
-                        refresh_action = self.manual_update_request
-                        self.manual_update_request = ()
+                    if self.manual_jobs:
+                        job = self.manual_jobs.pop()
+                        self.active_job = job
+                    elif not self.display_worker.is_idle():
+                        continue
+
+                playlist_manager = self.device_config.get_playlist_manager()
+                latest_refresh = self.device_config.get_refresh_info()
+                current_dt = self._get_current_datetime()
+
+                if job:
+                    # handle immediate update request
+                    logger.info(f"Manual update requested. | job_id: {job.id} | priority: {job.priority}")
+                    refresh_action = job.refresh_action
+                else:
+
+                    if self.device_config.get_config("log_system_stats"):
+                        self.log_system_stats()
+
+                    # handle refresh based on playlists
+                    logger.info(f"Running interval refresh check. | current_time: {current_dt.strftime('%Y-%m-%d %H:%M:%S')}")
+                    previous_check_dt, last_check_dt = last_check_dt, current_dt
+                    playlist, plugin_instance = self._determine_next_plugin(playlist_manager, latest_refresh, current_dt)
+                    if plugin_instance:
+                        # the playlist moves on to the next plugin only once this tick is not cancelled, so a
+                        # manual request preempting it can't make the rotation skip a plugin
+                        refresh_action = PlaylistRefresh(playlist, plugin_instance,
+                                                         advance_playlist=playlist.peek_next_plugin() is plugin_instance)
+                        # tracked as the active job so manual requests can cancel it
+                        with self.condition:
+                            job = RefreshJob(refresh_action, PRIORITY_SCHEDULED)
+                            self.active_job = job
+
+                        # regenerate all stale instances at once, e.g. after a reboot, giving way to manual requests
+                        self.warmup.run(playlist, current_dt, should_stop=lambda: job.is_cancelled() or self._has_manual_jobs())
+                        if job.is_cancelled() or self._has_manual_jobs():
+                            # the tick is retried once the manual requests are done
+                            logger.info(f"Scheduled refresh preempted by a manual request. | plugin_instance: {plugin_instance.name}")
+                            last_check_dt = previous_check_dt
+                            refresh_action = None
+                            cancelled = True
+                        else:
+                            refresh_action.prefetched_image = self._take_prefetched_image(playlist, plugin_instance)
+
+                if refresh_action:
+                    job.set_status(RefreshJob.RENDERING)
+                    plugin_config = self.device_config.get_plugin(refresh_action.get_plugin_id())
+                    if plugin_config is None:
+                        raise ValueError(f"Plugin config not found for '{refresh_action.get_plugin_id()}'.")
+                    plugin = get_plugin_instance(plugin_config)
+                    image = refresh_action.execute(plugin, self.device_config, current_dt)
+                    image_settings = plugin.config.get("image_settings", [])
+
+                    # hash the post-processed frame, which is what reaches the display
+                    frame = self.display_manager.prepare_image(image, image_settings)
+                    image_hash = compute_image_hash(frame)
+
+                    refresh_info = refresh_action.get_refresh_info()
+                    refresh_info.update({"refresh_time": current_dt.isoformat(), "image_hash": image_hash})
+                    # check if image is the same as current image
+                    # exact match unless the plugin opts into the perceptual comparison in its plugin-info.json,
+                    # small real changes such as a clock's minute digit are within any nonzero threshold
+                    threshold = int(plugin_config.get("change_threshold", 0))
+                    cancelled = job.is_cancelled()
+                    if cancelled:
+                        # a newer or higher priority request arrived while rendering, leave the display to it
+                        logger.info(f"Refresh cancelled, skipping display update. | refresh_info: {refresh_info}")
+                    elif not is_visually_identical(image_hash, latest_refresh.image_hash, threshold):
+                        # the display worker updates the panel and finishes the job, the next image can
+                        # be generated meanwhile
+                        logger.info(f"Updating display. | refresh_info: {refresh_info}")
+                        self._advance_playlist(refresh_action)
+                        # the worker saves the refresh info once the frame is on the panel
+                        self.display_worker.submit(image, frame, image_settings, job, refresh_info)
+                        job = None
+                        self.device_config.write_state()
                     else:
+                        # keep the hash of the frame on the display so small changes can't accumulate
+                        refresh_info["image_hash"] = latest_refresh.image_hash
+                        logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
+                        self._advance_playlist(refresh_action)
+                        # update latest refresh data, only runtime state changed so the config file is left alone
+                        self.device_config.refresh_info = RefreshInfo(**refresh_info)
+                        self.device_config.write_state()
 
-                        if self.device_config.get_config("log_system_stats"):
-                            self.log_system_stats()
-
-                        # handle refresh based on playlists
-                        logger.info(f"Running interval refresh check. | current_time: {current_dt.strftime('%Y-%m-%d %H:%M:%S')}")
-                        playlist, plugin_instance = self._determine_next_plugin(playlist_manager, latest_refresh, current_dt)
-                        if plugin_instance:
-                            refresh_action = PlaylistRefresh(playlist, plugin_instance)
-
-                    if refresh_action:
-                        plugin_config = self.device_config.get_plugin(refresh_action.get_plugin_id())
-                        if plugin_config is None:
-                            logger.error(f"Plugin config not found for '{refresh_action.get_plugin_id()}'.")
-                            continue
-                        plugin = get_plugin_instance(plugin_config)
-                        image = refresh_action.execute(plugin, self.device_config, current_dt)
-                        image_hash = compute_image_hash(image)
-
-                        refresh_info = refresh_action.get_refresh_info()
-                        refresh_info.update({"refresh_time": current_dt.isoformat(), "image_hash": image_hash})
-                        # check if image is the same as current image
-                        if image_hash != latest_refresh.image_hash:
-                            logger.info(f"Updating display. | refresh_info: {refresh_info}")
-                            self.display_manager.display_image(image, image_settings=plugin.config.get("image_settings", []))
-                        else:
-                            logger.info(f"Image already displayed, skipping refresh. | refresh_info: {refresh_info}")
+                if job:
+                    job.set_status(RefreshJob.CANCELLED if cancelled else RefreshJob.DONE)
 
-                        # update latest refresh data in the device config
-                        self.device_config.refresh_info = RefreshInfo(**refresh_info)
-                        self.device_config.write_config()
+                self._schedule_prefetch(current_dt)
 
             except Exception as e:
                 logger.exception('Exception during refresh')
-                self.refresh_result["exception"] = e  # Capture exception
+                if job:
+                    job.set_status(RefreshJob.FAILED, exception=e)
+                # a failing plugin must not stop the rotation
+                if refresh_action and not (job and job.is_cancelled()):
+                    self._advance_playlist(refresh_action)
             finally:
-                self.refresh_event.set()
+                with self.condition:
+                    self.active_job = None
 
-    def manual_update(self, refresh_action):
-        """Manually triggers an update for the specified plugin id and plugin settings by notifying the background process."""
-        if self.running:
-            with self.condition:
-                self.manual_update_request = refresh_action
-                self.refresh_result = {}
-                self.refresh_event.clear()
+    def _has_manual_jobs(self):
+        with self.condition:
+            return bool(self.manual_jobs)
 
-                self.condition.notify_all()  # Wake the thread to process manual update
+    def _on_display_idle(self):
+        """Wakes the refresh loop once the display worker is done, the saved refresh info schedules the next check."""
+        with self.condition:
+            self.condition.notify_all()
+        self._schedule_prefetch(self._get_current_datetime())
 
-            self.refresh_event.wait()
-            if self.refresh_result.get("exception"):
-                raise self.refresh_result.get("exception")
-        else:
-            logger.warn("Background refresh task is not running, unable to do a manual update")
+    def submit_manual_update(self, refresh_action, priority=PRIORITY_WEB):
+        """Queues a manual refresh and returns its `RefreshJob` without waiting for it.
+
+        Requests are coalesced with the queued job for the same target, where the latest request wins,
+        and identical requests share a job. The refresh in progress is cancelled before it updates the
+        display when the new request targets the same plugin with different settings or has a higher priority.
+        """
+        with self.condition:
+            job = RefreshJob(refresh_action, priority)
+            if not self.running:
+                logger.warn("Background refresh task is not running, unable to do a manual update")
+                self.jobs.add(job)
+                job.set_status(RefreshJob.FAILED, exception=RuntimeError("Background refresh task is not running"))
+                return job
+
+            active_job = self.active_job
+            in_flight = active_job and active_job.status in (RefreshJob.QUEUED, RefreshJob.RENDERING)
+            cancel_reason = None
+            if in_flight and not active_job.is_cancelled() and not self.manual_jobs.find(job.key):
+                if active_job.signature == job.signature and active_job.priority <= priority:
+                    logger.info(f"Identical refresh in progress, collapsing request. | job_id: {active_job.id}")
+                    return active_job
+                if active_job.key == job.key:
+                    cancel_reason = "Superseded by a newer request"
+                elif priority < active_job.priority:
+                    cancel_reason = "Preempted by a higher priority request"
+
+            queued_job = self.manual_jobs.push(job)
+            if queued_job is not job:
+                logger.info(f"Refresh already queued, coalescing request. | job_id: {queued_job.id}")
+                return queued_job
+
+            # registered even when rejected by a full queue, so its status can be looked up
+            self.jobs.add(job)
+            if job.is_finished():
+                logger.warning(f"Refresh queue is full, rejecting request. | job_id: {job.id}")
+                return job
+
+            # only cancelled once the new request is queued, a rejected request leaves it running
+            if cancel_reason:
+                active_job.cancel(cancel_reason)
+                self.cancelled_in_flight += 1
+            self.condition.notify_all()  # Wake the thread to process manual update
+            return job
+
+    def manual_update(self, refresh_action, priority=PRIORITY_WEB):
+        """Manually triggers an update for the specified plugin id and plugin settings and waits for it to finish."""
+        job = self.submit_manual_update(refresh_action, priority)
+        job.wait()
+        if job.exception and self.running:
+            raise job.exception
+
+    def get_queue_metrics(self):
+        """Returns the depth, counters and wait times of the manual refresh queue and the refresh in progress."""
+        with self.condition:
+            metrics = self.manual_jobs.get_metrics()
+            metrics["cancelled_in_flight"] = self.cancelled_in_flight
+            metrics["active_job"] = self.active_job.to_dict() if self.active_job else None
+        return metrics
+
+    def get_job(self, job_id):
+        """Returns the manual refresh job with the given id, or None."""
+        return self.jobs.get(job_id)
 
     def signal_config_change(self):
         """Notify the background thread that config has changed (e.g., interval updated)."""
         if self.running:
+            self._discard_prefetch()
             with self.condition:
                 self.condition.notify_all()
 
+    def _schedule_prefetch(self, current_dt):
+        """Schedules a background render of the next playlist plugin ahead of its display slot.
+
+        The render starts `prefetch_lead_seconds` before the next plugin cycle is due, so the scheduled
+        refresh only has to hash and display an image that is already generated. Disabled when the lead
+        time is not configured.
+        """
+        lead_seconds = self.device_config.get_config("prefetch_lead_seconds", default=0)
+        latest_refresh_dt = self.device_config.get_refresh_info().get_refresh_datetime()
+        if not lead_seconds or not latest_refresh_dt:
+            return
+
+        plugin_cycle_interval = self.device_config.get_config("plugin_cycle_interval_seconds", default=3600)
+        slot_dt = latest_refresh_dt + timedelta(seconds=plugin_cycle_interval)
+        if slot_dt <= current_dt:
+            return
+
+        with self.prefetch_lock:
+            if self.prefetch_timer and self.prefetch_timer.is_alive():
+                if self.prefetch_slot == slot_dt:
+                    return
+                self.prefetch_timer.cancel()
+
+            delay = (slot_dt - timedelta(seconds=lead_seconds) - current_dt).total_seconds()
+            logger.debug(f"Scheduling prefetch. | slot: {slot_dt.strftime('%Y-%m-%d %H:%M:%S')} | delay: {max(delay, 0):.0f}s")
+            self.prefetch_slot = slot_dt
+            self.prefetch_timer = threading.Timer(max(delay, 0), self._prefetch, args=(slot_dt,))
+            self.prefetch_timer.daemon = True
+            self.prefetch_timer.start()
+
+    def _prefetch(self, slot_dt):
+        """Generates the image of the plugin instance expected to be displayed at `slot_dt`."""
+        try:
+            playlist = self.device_config.get_playlist_manager().determine_active_playlist(slot_dt)
+            plugin_instance = playlist.peek_next_plugin() if playlist else None
+            if not plugin_instance:
+                return
+
+            if not plugin_instance.should_refresh(slot_dt):
+                # the latest image on disk will be reused, nothing to render ahead of time
+                logger.debug(f"Skipping prefetch, plugin instance does not need a refresh. | plugin_instance: {plugin_instance.name}")
+                return
+
+            plugin_config = self.device_config.get_plugin(plugin_instance.plugin_id)
+            if plugin_config is None:
+                logger.error(f"Plugin config not found for '{plugin_instance.plugin_id}'.")
+                return
+
+            logger.info(f"Prefetching plugin instance. | playlist: {playlist.name} | plugin_instance: {plugin_instance.name}")
+            plugin = get_plugin_instance(plugin_config)
+            image = plugin.generate_image(plugin_instance.settings, self.device_config)
+
+            with self.prefetch_lock:
+                if self.prefetch_slot == slot_dt:
+                    self.prefetched = (self._prefetch_key(playlist, plugin_instance), image)
+        except Exception:
+            logger.exception("Exception during prefetch")
+
+    def _take_prefetched_image(self, playlist, plugin_instance):
+        """Returns the prefetched image for the plugin instance, or None if there is none or it is stale."""
+        with self.prefetch_lock:
+            prefetched, self.prefetched = self.prefetched, None
+
+        if not prefetched:
+            return None
+
+        key, image = prefetched
+        if key != self._prefetch_key(playlist, plugin_instance):
+            logger.info(f"Discarding stale prefetched image. | plugin_instance: {plugin_instance.name}")
+            return None
+        return image
+
+    def _discard_prefetch(self):
+        """Cancels any pending prefetch and drops the prefetched image."""
+        with self.prefetch_lock:
+            if self.prefetch_timer:
+                self.prefetch_timer.cancel()
+            self.prefetch_timer = None
+            self.prefetch_slot = None
+            self.prefetched = None
+
+    def _prefetch_key(self, playlist, plugin_instance):
+        """Identifies the inputs of a prefetched image, used to detect settings changes since it was generated."""
+        return (
+            playlist.name,
+            plugin_instance.plugin_id,
+            plugin_instance.name,
+            json.dumps(plugin_instance.settings, sort_keys=True, default=str),
+            self.device_config.get_resolution(),
+            self.device_config.get_config("orientation"),
+        )
+
     def _get_current_datetime(self):
         """Retrieves the current datetime based on the device's configured timezone."""
         tz_str = self.device_config.get_config("timezone", default="UTC")
@@ -168,6 +401,8 @@ class RefreshTask:
             logger.info(f"No active playlist determined.")
             return None, None
 
+        # a playlist window that just opened is shown right away instead of at the next plugin cycle
+        playlist_changed = playlist_manager.active_playlist not in (None, playlist.name)
         playlist_manager.active_playlist = playlist.name
         if not playlist.plugins:
             logger.info(f"Active playlist '{playlist.name}' has no plugins.")
@@ -175,18 +410,32 @@ class RefreshTask:
 
         latest_refresh_dt = latest_refresh_info.get_refresh_datetime()
         plugin_cycle_interval = self.device_config.get_config("plugin_cycle_interval_seconds", default=3600)
-        should_refresh = PlaylistManager.should_refresh(latest_refresh_dt, plugin_cycle_interval, current_dt)
+        should_refresh = playlist_changed or PlaylistManager.should_refresh(latest_refresh_dt, plugin_cycle_interval, current_dt)
+
+        if not should_refresh and latest_refresh_info.playlist == playlist.name:
+            # refresh the instance on display in place when its scheduled time has arrived
+            plugin = playlist.find_plugin(latest_refresh_info.plugin_id, latest_refresh_info.plugin_instance)
+            scheduled_dt = plugin.get_next_scheduled_dt() if plugin else None
+            if scheduled_dt and scheduled_dt <= current_dt:
+                logger.info(f"Scheduled refresh of displayed plugin. | active_playlist: {playlist.name} | plugin_instance: {plugin.name}")
+                return playlist, plugin
 
         if not should_refresh:
             latest_refresh_str = latest_refresh_dt.strftime('%Y-%m-%d %H:%M:%S') if latest_refresh_dt else "None"
             logger.info(f"Not time to update display. | latest_update: {latest_refresh_str} | plugin_cycle_interval: {plugin_cycle_interval}")
             return None, None
 
-        plugin = playlist.get_next_plugin()
+        plugin = playlist.peek_next_plugin()
         logger.info(f"Determined next plugin. | active_playlist: {playlist.name} | plugin_instance: {plugin.name}")
 
         return playlist, plugin
     
+    def _advance_playlist(self, refresh_action):
+        """Moves the playlist of a scheduled refresh on to the refreshed plugin instance."""
+        if isinstance(refresh_action, PlaylistRefresh) and refresh_action.advance_playlist:
+            refresh_action.advance_playlist = False
+            refresh_action.playlist.get_next_plugin()
+
     def log_system_stats(self):
         metrics = {
             'cpu_percent': psutil.cpu_percent(interval=1),
@@ -217,6 +466,14 @@ class RefreshAction:
         """Return the plugin ID associated with this refresh."""
         raise NotImplementedError("Subclasses must implement the get_plugin_id method.")
 
+    def get_job_key(self):
+        """Return a key identifying what this refresh displays, the latest queued request for a key wins."""
+        raise NotImplementedError("Subclasses must implement the get_job_key method.")
+
+    def get_job_signature(self):
+        """Return a key identifying this exact request including its settings, identical requests share a job."""
+        raise NotImplementedError("Subclasses must implement the get_job_signature method.")
+
 class ManualRefresh(RefreshAction):
     """Performs a manual refresh based on a plugin's ID and its associated settings.
     
@@ -241,18 +498,34 @@ class ManualRefresh(RefreshAction):
         """Return the plugin ID associated with this refresh."""
         return self.plugin_id
 
+    def get_job_key(self):
+        """Return a key identifying what this refresh displays, the latest queued request for a key wins."""
+        return f"manual/{self.plugin_id}"
+
+    def get_job_signature(self):
+        """Return a key identifying this exact request including its settings, identical requests share a job."""
+        settings = json.dumps(self.plugin_settings, sort_keys=True, default=str)
+        return f"{self.get_job_key()}/{hashlib.sha256(settings.encode('utf-8')).hexdigest()}"
+
 class PlaylistRefresh(RefreshAction):
     """Performs a refresh using a plugin instance within a playlist context.
 
     Attributes:
         playlist: The playlist object associated with the refresh.
         plugin_instance: The plugin instance to refresh.
+        prefetched_image: Image generated ahead of time for this plugin instance, used instead of generating a new one.
+        advance_playlist: Whether the playlist's current_plugin_index moves on to the plugin instance once the
+            refresh completes, set for scheduled refreshes of the next plugin in the playlist.
+        cancel_event: Event set when the refresh was abandoned, the image is then not saved to the plugin instance.
     """
 
-    def __init__(self, playlist, plugin_instance, force=False):
+    def __init__(self, playlist, plugin_instance, force=False, prefetched_image=None, advance_playlist=False, cancel_event=None):
         self.playlist = playlist
         self.plugin_instance = plugin_instance
         self.force = force
+        self.prefetched_image = prefetched_image
+        self.advance_playlist = advance_playlist
+        self.cancel_event = cancel_event
 
     def get_refresh_info(self):
         """Return refresh metadata as a dictionary."""
@@ -267,6 +540,15 @@ class PlaylistRefresh(RefreshAction):
         """Return the plugin ID associated with this refresh."""
         return self.plugin_instance.plugin_id
 
+    def get_job_key(self):
+        """Return a key identifying what this refresh displays, the latest queued request for a key wins."""
+        return f"playlist/{self.playlist.name}/{self.plugin_instance.plugin_id}/{self.plugin_instance.name}"
+
+    def get_job_signature(self):
+        """Return a key identifying this exact request including its settings, identical requests share a job."""
+        settings = json.dumps(self.plugin_instance.settings, sort_keys=True, default=str)
+        return f"{self.get_job_key()}/{self.force}/{hashlib.sha256(settings.encode('utf-8')).hexdigest()}"
+
     def execute(self, plugin, device_config, current_dt: datetime):
         """Performs a refresh for the specified plugin instance within its playlist context."""
         # Determine the file path for the plugin's image
@@ -274,10 +556,31 @@ class PlaylistRefresh(RefreshAction):
 
         # Check if a refresh is needed based on the plugin instance's criteria
         if self.plugin_instance.should_refresh(current_dt) or self.force:
-            logger.info(f"Refreshing plugin instance. | plugin_instance: '{self.plugin_instance.name}'") 
-            # Generate a new image
-            image = plugin.generate_image(self.plugin_instance.settings, device_config)
-            image.save(plugin_image_path)
+            # Skip generating the image if the plugin reports its data is unchanged
+            data_fingerprint = None if self.force else self._get_data_fingerprint(plugin, device_config)
+            image = None
+            if data_fingerprint and data_fingerprint == self.plugin_instance.data_fingerprint and os.path.exists(plugin_image_path):
+                logger.info(f"Plugin data unchanged, using latest image. | plugin_instance: '{self.plugin_instance.name}'")
+                with Image.open(plugin_image_path) as img:
+                    latest_image = img.copy()
+            else:
+                if self.prefetched_image is not None:
+                    logger.info(f"Using prefetched image for plugin instance. | plugin_instance: '{self.plugin_instance.name}'")
+                    image = self.prefetched_image
+                else:
+                    logger.info(f"Refreshing plugin instance. | plugin_instance: '{self.plugin_instance.name}'") 
+                    # Generate a new image
+                    image = plugin.generate_image(self.plugin_instance.settings, device_config)
+
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                logger.info(f"Refresh abandoned, discarding image. | plugin_instance: '{self.plugin_instance.name}'")
+                return image if image is not None else latest_image
+
+            if image is None:
+                image = latest_image
+            else:
+                image.save(plugin_image_path)
+                self.plugin_instance.data_fingerprint = data_fingerprint
             self.plugin_instance.latest_refresh_time = current_dt.isoformat()
         else:
             logger.info(f"Not time to refresh plugin instance, using latest image. | plugin_instance: {self.plugin_instance.name}.")
@@ -285,4 +588,26 @@ class PlaylistRefresh(RefreshAction):
             with Image.open(plugin_image_path) as img:
                 image = img.copy()
 
-        return image
\ No newline at end of file
+        return image
+
+    def _get_data_fingerprint(self, plugin, device_config):
+        """Combines the plugin's data fingerprint with the inputs that affect every image, returns None if unsupported."""
+        try:
+            fingerprint = plugin.get_data_fingerprint(self.plugin_instance.settings, device_config)
+        except Exception as e:
+            logger.warning(f"Failed to get data fingerprint, regenerating image. | plugin_instance: '{self.plugin_instance.name}' | error: {e}")
+            return None
+
+        if fingerprint is None:
+            return None
+
+        fingerprint_data = [
+            fingerprint,
+            self.plugin_instance.settings,
+            device_config.get_resolution(),
+            device_config.get_config("orientation"),
+            device_config.get_config("timezone"),
+            device_config.get_config("time_format"),
+        ]
+        serialized = json.dumps(fingerprint_data, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
\ No newline at end of file
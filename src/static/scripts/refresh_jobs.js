@@ -0,0 +1,32 @@
+// Polls the status of a queued display refresh until it is done, failed or cancelled, resolves with the final job status
+async function waitForRefreshJob(statusUrl, intervalMs = 1000) {
+    while (true) {
+        const response = await fetch(statusUrl);
+        const job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.error || 'Failed to get refresh status');
+        }
+        if (['done', 'failed', 'cancelled'].includes(job.status)) {
+            return job;
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
+// Resolves with a message describing the outcome of a request that may have queued a display refresh
+async function getRefreshResult(response, result) {
+    if (!response.ok) {
+        return { success: false, message: result.error };
+    }
+    if (!result.status_url) {
+        return { success: true, message: result.message };
+    }
+    const job = await waitForRefreshJob(result.status_url);
+    if (job.status === 'failed') {
+        return { success: false, message: `An error occurred: ${job.error}` };
+    }
+    if (job.status === 'cancelled') {
+        return { success: false, message: `Display update cancelled: ${job.error}` };
+    }
+    return { success: true, message: 'Display updated' };
+}
@@ -2,7 +2,11 @@ import logging
 import os
 import socket
 import subprocess
+import threading
 
+from collections import OrderedDict
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 
@@ -33,6 +37,16 @@ FONT_FAMILIES = {
     }]
 }
 
+# Number of font objects kept loaded, each family, weight and size is a separate entry
+FONT_CACHE_SIZE = 32
+
+# Number of text measurements remembered by get_text_bbox
+TEXT_BBOX_CACHE_SIZE = 4096
+
+_font_lock = threading.Lock()
+_font_cache = OrderedDict()
+_font_data = {}
+
 FONTS = {
     "ds-gigi": "DS-DIGI.TTF",
     "napoli": "Napoli.ttf",
@@ -49,11 +63,26 @@ def resolve_path(file_path):
     src_path = Path(src_dir)
     return str(src_path / file_path)
 
-def get_ip_address():
-    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
-        s.connect(("8.8.8.8", 80))
-        ip_address = s.getsockname()[0]
-    return ip_address
+def get_ip_address(timeout=2):
+    """Returns the IP address of the interface used for outbound traffic.
+
+    The lookup runs on a daemon thread so a stalled network stack can't block the caller,
+    None is returned when it fails or doesn't finish within `timeout` seconds, e.g. while offline.
+    """
+    result = {}
+
+    def lookup():
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                result["ip_address"] = s.getsockname()[0]
+        except OSError as e:
+            logger.warning(f"Failed to determine IP address: {e}")
+
+    thread = threading.Thread(target=lookup, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result.get("ip_address")
 
 def get_wifi_name():
     try:
@@ -71,23 +100,66 @@ def is_connected():
     except OSError:
         return False
 
+def _get_font_entry(font_name, font_weight="normal"):
+    if font_name not in FONT_FAMILIES:
+        logger.warn(f"Requested font not found: font_name={font_name}")
+        return None
+
+    font_variants = FONT_FAMILIES[font_name]
+    font_entry = next((entry for entry in font_variants if entry["font-weight"] == font_weight), None)
+    if font_entry is None:
+        font_entry = font_variants[0]  # Default to first available variant
+    return font_entry
+
+def _get_font_data(font_file):
+    """Returns the content of a font file, read from disk only once."""
+    data = _font_data.get(font_file)
+    if data is None:
+        with open(resolve_path(os.path.join("static", "fonts", font_file)), "rb") as f:
+            data = f.read()
+        _font_data[font_file] = data
+    return data
+
 def get_font(font_name, font_size=50, font_weight="normal"):
-    if font_name in FONT_FAMILIES:
-        font_variants = FONT_FAMILIES[font_name]
+    """Returns the font for the family, weight and size, the most recently used fonts stay loaded.
 
-        font_entry = next((entry for entry in font_variants if entry["font-weight"] == font_weight), None)
-        if font_entry is None:
-            font_entry = font_variants[0]  # Default to first available variant
+    Fonts are shared between callers and must not be modified, e.g. with set_variation_by_name.
+    """
+    font_entry = _get_font_entry(font_name, font_weight)
+    if font_entry is None:
+        return None
 
-        if font_entry:
-            font_path = resolve_path(os.path.join("static", "fonts", font_entry["file"]))
-            return ImageFont.truetype(font_path, font_size)
-        else:
-            logger.warn(f"Requested font weight not found: font_name={font_name}, font_weight={font_weight}")
-    else:
-        logger.warn(f"Requested font not found: font_name={font_name}")
+    key = (font_name, font_entry["font-weight"], font_size)
+    with _font_lock:
+        font = _font_cache.get(key)
+        if font is not None:
+            _font_cache.move_to_end(key)
+            return font
+
+    font = ImageFont.truetype(BytesIO(_get_font_data(font_entry["file"])), font_size)
+    with _font_lock:
+        _font_cache[key] = font
+        while len(_font_cache) > FONT_CACHE_SIZE:
+            _font_cache.popitem(last=False)
+    return font
+
+def preload_fonts(font_names):
+    """Reads the files of every variant of the font families, so drawing with them doesn't wait on disk."""
+    for font_name in dict.fromkeys(font_names):
+        for font_entry in FONT_FAMILIES.get(font_name, []):
+            try:
+                _get_font_data(font_entry["file"])
+            except OSError as e:
+                logger.warning(f"Failed to preload font: font_name={font_name}, error={e}")
+
+@lru_cache(maxsize=TEXT_BBOX_CACHE_SIZE)
+def get_text_bbox(text, font_name, font_size=50, font_weight="normal"):
+    """Returns the bounding box of the text in the font from `get_font`, remembering it for repeated measurements.
 
-    return None
+    Measurements are keyed by the font's family, weight and size rather than the font object, so they
+    don't keep fonts evicted from the font cache loaded.
+    """
+    return get_font(font_name, font_size, font_weight).getbbox(text)
 
 def get_fonts():
     fonts_list = []
@@ -104,13 +176,14 @@ def get_fonts():
 def get_font_path(font_name):
     return resolve_path(os.path.join("static", "fonts", FONTS[font_name]))
 
-def generate_startup_image(dimensions=(800,480)):
+def generate_startup_image(dimensions=(800,480), hostname=None, ip=None):
+    """Draws the startup splash, the IP address line is left out when `ip` is not known."""
     bg_color = (255,255,255)
     text_color = (0,0,0)
     width, height = dimensions
 
-    hostname = socket.gethostname()
-    ip = get_ip_address()
+    if hostname is None:
+        hostname = socket.gethostname()
 
     image = Image.new("RGBA", dimensions, bg_color)
     image_draw = ImageDraw.Draw(image)
@@ -119,19 +192,19 @@ def generate_startup_image(dimensions=(800,480)):
     image_draw.text((width/2, height/2), "inkypi", anchor="mm", fill=text_color, font=get_font("Jost", title_font_size))
 
     text = f"To get started, visit http://{hostname}.local"
-    text_font_size = width * 0.032
+    text_font = get_font("Jost", width * 0.032)
 
     # Draw the instructions
     y_text = height * 3 / 4
-    image_draw.text((width/2, y_text), text, anchor="mm", fill=text_color, font=get_font("Jost", text_font_size))
+    image_draw.text((width/2, y_text), text, anchor="mm", fill=text_color, font=text_font)
 
     # Draw the IP on a line below
-    ip_text = f"or http://{ip}"
-    ip_text_font_size = width * 0.032
-    bbox = image_draw.textbbox((0, 0), text, font=get_font("Jost", text_font_size))
-    text_height = bbox[3] - bbox[1]
-    ip_y = y_text + text_height * 1.35
-    image_draw.text((width/2, ip_y), ip_text, anchor="mm", fill=text_color, font=get_font("Jost", ip_text_font_size))
+    if ip:
+        ip_text = f"or http://{ip}"
+        bbox = image_draw.textbbox((0, 0), text, font=text_font)
+        text_height = bbox[3] - bbox[1]
+        ip_y = y_text + text_height * 1.35
+        image_draw.text((width/2, ip_y), ip_text, anchor="mm", fill=text_color, font=text_font)
 
     return image
 
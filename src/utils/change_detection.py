@@ -0,0 +1,63 @@
+"""
+Change Detection
+
+Decides whether a new frame differs from the one on the display. Frames are hashed after the
+display post-processing, since that is what reaches the panel, with:
+- a fast BLAKE2b digest of the frame bytes, detecting any change.
+- a perceptual hash, the gray levels of a 16x16 thumbnail reduced to 16 levels each, which
+  barely changes for differences invisible on e-paper such as anti-aliasing noise.
+
+The two are stored together as "<digest>:<perceptual hash>" in the refresh info. Frames are
+compared by digest only, unless a plugin sets "change_threshold" in its plugin-info.json: the
+perceptual hash can't tell a small real change, like a clock's minute digit, from noise.
+"""
+
+import hashlib
+
+from PIL import Image
+
+DIGEST_SIZE = 16
+PERCEPTUAL_HASH_SIZE = 16
+
+
+def compute_image_hash(image):
+    """Returns the "<digest>:<perceptual hash>" fingerprint of a frame."""
+    digest = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    digest.update(f"{image.mode}:{image.width}x{image.height}:".encode("utf-8"))
+    digest.update(image.tobytes())
+    return f"{digest.hexdigest()}:{compute_perceptual_hash(image)}"
+
+
+def compute_perceptual_hash(image, hash_size=PERCEPTUAL_HASH_SIZE):
+    """Returns the gray levels of a hash_size x hash_size thumbnail of the image as a hex string,
+    one digit per cell.
+    """
+    gray = image if image.mode == "L" else image.convert("L")
+    thumbnail = gray.resize((hash_size, hash_size), Image.BOX)
+    return "".join(f"{value >> 4:x}" for value in thumbnail.tobytes())
+
+
+def is_visually_identical(image_hash, other_hash, threshold=0):
+    """Returns whether two frame fingerprints describe the same image.
+
+    Args:
+        image_hash (str): Fingerprint from `compute_image_hash`.
+        other_hash (str): Fingerprint to compare with, may be None or in an older format.
+        threshold (int): Number of thumbnail cells that may change by more than one gray level
+            for the frames to still be considered identical. 0 only accepts identical frames.
+    """
+    if not image_hash or not other_hash:
+        return False
+    if image_hash == other_hash:
+        return True
+    if threshold <= 0 or image_hash.count(":") != 1 or other_hash.count(":") != 1:
+        return False
+
+    perceptual_hash, other_perceptual_hash = image_hash.split(":")[1], other_hash.split(":")[1]
+    if len(perceptual_hash) != len(other_perceptual_hash):
+        return False
+    changed_cells = sum(
+        1 for level, other_level in zip(perceptual_hash, other_perceptual_hash)
+        if abs(int(level, 16) - int(other_level, 16)) > 1
+    )
+    return changed_cells <= threshold
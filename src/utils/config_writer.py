@@ -0,0 +1,148 @@
+"""
+Config Writer
+
+Persists the device config without blocking the caller and without risking a corrupt file.
+- Writes are atomic: the content goes to a temporary file in the same directory, is fsynced and
+  renamed over the config, so a power cut leaves either the old or the new file.
+- Bursts of writes (e.g. a refresh followed by a web edit) are coalesced: the file is written by a
+  background thread once no new content arrived for `delay_seconds`.
+- Content identical to what is already on disk is not written at all, saving SD card wear.
+"""
+
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELAY_SECONDS = 2
+
+
+class ConfigWriter:
+    """Debounced, atomic writer of a single file.
+
+    Attributes:
+        path (str): Path of the file to write.
+        delay_seconds (float): Seconds without new content before the pending content is written.
+        writes (int): Number of times the file was written.
+        skipped (int): Number of writes skipped because the content was unchanged.
+    """
+
+    def __init__(self, path, delay_seconds=DEFAULT_DELAY_SECONDS):
+        self.path = path
+        self.delay_seconds = delay_seconds
+        self.writes = 0
+        self.skipped = 0
+
+        self.condition = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.pending = None
+        self.pending_since = None
+        self.version = 0
+        self.written_version = 0
+        self.written = self._read_current()
+        self.thread = None
+
+    def write(self, content):
+        """Schedules the content to be written, replacing any content still waiting to be written."""
+        with self.condition:
+            self.version += 1
+            self.pending = (self.version, content)
+            self.pending_since = time.monotonic()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="config-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+
+    def flush(self):
+        """Writes the pending content now, used on shutdown and when the file must be current.
+
+        Also waits for a write the background thread already started, which may hold the latest content.
+        """
+        with self.condition:
+            pending, self.pending = self.pending, None
+        if pending:
+            self._write_atomic(*pending)
+        with self.write_lock:
+            pass
+
+    def _run(self):
+        while True:
+            with self.condition:
+                if self.pending is None:
+                    # cleared under the condition, so a write arriving after this starts a new thread
+                    self.thread = None
+                    return
+                remaining = self.pending_since + self.delay_seconds - time.monotonic()
+                if remaining > 0:
+                    # new content resets the delay, keep waiting until the burst is over
+                    self.condition.wait(timeout=remaining)
+                    continue
+                pending, self.pending = self.pending, None
+            # written outside the condition so callers never wait on the SD card
+            self._write_atomic(*pending)
+
+    def _write_atomic(self, version, content):
+        """Writes the content to a temporary file and renames it over the target, unless unchanged or outdated."""
+        with self.write_lock:
+            if version <= self.written_version:
+                return
+            if content == self.written:
+                self.written_version = version
+                self.skipped += 1
+                logger.debug(f"Config unchanged, skipping write of {self.path}")
+                return
+
+            directory = os.path.dirname(self.path)
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".device-", suffix=".tmp")
+                try:
+                    self._copy_mode(tmp_path)
+                    with os.fdopen(fd, "w") as f:
+                        f.write(content)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    os.remove(tmp_path)
+                    raise
+                self._fsync_directory(directory)
+            except OSError as e:
+                logger.error(f"Failed to write config to {self.path}: {e}")
+                return
+
+            self.written = content
+            self.written_version = version
+            self.writes += 1
+            logger.debug(f"Wrote config to {self.path}")
+
+    def _read_current(self):
+        try:
+            with open(self.path) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _copy_mode(self, tmp_path):
+        """Gives the temporary file the permissions of the file it replaces, mkstemp creates it as 0600."""
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _fsync_directory(directory):
+        """Persists the rename itself, not supported on every platform."""
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
@@ -0,0 +1,159 @@
+"""
+Dither
+
+Palette quantization for e-paper panels using NumPy. An image is mapped to palette indices in a
+single pass over the pixel array using a precomputed lookup table, optionally with dithering, and
+the indices are split into the packed 1-bit planes used by multi-color panel drivers.
+
+Supported dithering algorithms:
+- none: nearest palette color.
+- bayer: ordered dithering with an 8x8 Bayer matrix, fully vectorized.
+- floyd-steinberg: error diffusion, delegated to Pillow's C implementation.
+- atkinson: error diffusion spreading 3/4 of the error, giving higher contrast but slower.
+"""
+
+import logging
+from functools import lru_cache
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+DITHER_ALGORITHMS = ("none", "bayer", "floyd-steinberg", "atkinson")
+DEFAULT_DITHER = "floyd-steinberg"
+
+BLACK_WHITE_RED_PALETTE = ((0, 0, 0), (255, 255, 255), (255, 0, 0))
+
+# Bits per channel of the palette lookup table, 5 bits gives a 32x32x32 table
+LUT_BITS = 5
+
+BAYER_MATRIX = np.array([
+    [0, 32, 8, 40, 2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44, 4, 36, 14, 46, 6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [3, 35, 11, 43, 1, 33, 9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47, 7, 39, 13, 45, 5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+], dtype=np.float32) / 64 - 0.5
+
+# (dx, dy, weight) of the neighbours receiving the quantization error
+ATKINSON_KERNEL = ((1, 0, 1 / 8), (2, 0, 1 / 8), (-1, 1, 1 / 8), (0, 1, 1 / 8), (1, 1, 1 / 8), (0, 2, 1 / 8))
+
+
+@lru_cache(maxsize=8)
+def get_palette_lut(palette):
+    """Returns a lookup table mapping each color, reduced to LUT_BITS per channel, to the index
+    of the nearest palette color.
+
+    Args:
+        palette (tuple): Tuple of (r, g, b) tuples.
+
+    Returns:
+        numpy.ndarray: uint8 array of shape (2**LUT_BITS,) * 3.
+    """
+    size = 1 << LUT_BITS
+    step = 256 // size
+    levels = np.arange(size, dtype=np.int32) * step + step // 2
+    grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+    colors = np.array(palette, dtype=np.int32)
+    distances = ((grid[..., None, :] - colors) ** 2).sum(axis=-1)
+    return distances.argmin(axis=-1).astype(np.uint8)
+
+
+def quantize(image, palette=BLACK_WHITE_RED_PALETTE, dither=DEFAULT_DITHER):
+    """Maps an image to the indices of the palette colors.
+
+    Args:
+        image (PIL.Image): Image to quantize.
+        palette (tuple): Tuple of (r, g, b) tuples.
+        dither (str): One of DITHER_ALGORITHMS.
+
+    Returns:
+        numpy.ndarray: uint8 array of palette indices with the image's height and width.
+    """
+    palette = tuple(tuple(color) for color in palette)
+    if dither not in DITHER_ALGORITHMS:
+        logger.warning(f"Unknown dither algorithm '{dither}', using '{DEFAULT_DITHER}'.")
+        dither = DEFAULT_DITHER
+
+    image = image.convert("RGB")
+    if dither == "floyd-steinberg":
+        palette_img = Image.new("P", (1, 1))
+        palette_img.putpalette([value for color in palette for value in color])
+        return np.asarray(image.quantize(palette=palette_img, dither=Image.Dither.FLOYDSTEINBERG))
+
+    pixels = np.asarray(image)
+    if dither == "bayer":
+        height, width = pixels.shape[:2]
+        threshold = np.tile(BAYER_MATRIX, ((height + 7) // 8, (width + 7) // 8))[:height, :width]
+        spread = 256 / (len(palette) - 1 or 1)
+        pixels = np.clip(pixels + threshold[..., None] * spread, 0, 255).astype(np.uint8)
+    elif dither == "atkinson":
+        return _error_diffusion(pixels, palette, ATKINSON_KERNEL)
+
+    return _lookup(pixels, palette)
+
+
+def split_layers(indices, layer_indices):
+    """Splits palette indices into 1-bit layers, one per palette index.
+
+    Each layer is black (0) where the pixel has that palette index and white (1) elsewhere,
+    which is the layout the Waveshare drivers expect for the black and color planes.
+
+    Args:
+        indices (numpy.ndarray): Palette indices returned by `quantize`.
+        layer_indices (list): Palette index of each layer.
+
+    Returns:
+        list: Mode '1' PIL images, one per layer.
+    """
+    height, width = indices.shape
+    return [
+        Image.frombytes("1", (width, height), pack_plane(indices != index).tobytes())
+        for index in layer_indices
+    ]
+
+
+def pack_plane(plane, bitorder="big"):
+    """Packs a boolean plane into bytes, 8 pixels per byte with rows padded to whole bytes.
+    The leftmost pixel is the most significant bit, or the least significant with bitorder "little".
+    """
+    return np.packbits(plane, axis=1, bitorder=bitorder)
+
+
+def _lookup(pixels, palette):
+    lut = get_palette_lut(palette)
+    reduced = pixels >> (8 - LUT_BITS)
+    return lut[reduced[..., 0], reduced[..., 1], reduced[..., 2]]
+
+
+def _error_diffusion(pixels, palette, kernel):
+    """Quantizes with error diffusion. Pixels are processed in order as each depends on the
+    error of the previous ones, so this loops over plain lists which is faster than indexing
+    NumPy arrays per pixel.
+    """
+    height, width = pixels.shape[:2]
+    lut = get_palette_lut(palette).tolist()
+    shift = 8 - LUT_BITS
+
+    channels = [pixels[..., channel].astype(np.float32).ravel().tolist() for channel in range(3)]
+    offsets = [(dx, dy * width + dx, weight) for dx, dy, weight in kernel]
+    size = width * height
+    indices = bytearray(size)
+    for position in range(size):
+        x = position % width
+        values = [min(max(int(channel[position]), 0), 255) for channel in channels]
+        index = lut[values[0] >> shift][values[1] >> shift][values[2] >> shift]
+        indices[position] = index
+        color = palette[index]
+        for channel, target in zip(channels, color):
+            error = channel[position] - target
+            if error:
+                for dx, offset, weight in offsets:
+                    neighbour = position + offset
+                    if neighbour < size and 0 <= x + dx < width:
+                        channel[neighbour] += error * weight
+    return np.frombuffer(bytes(indices), dtype=np.uint8).reshape(height, width)
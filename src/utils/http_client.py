@@ -0,0 +1,233 @@
+"""
+HTTP Client
+
+Shared HTTP layer used by the plugins. All requests go through one requests.Session, whose
+connection pool keeps a keep-alive connection per host, so repeated requests skip the TCP and
+TLS handshakes. Callers can opt GET responses into an on-disk cache that survives restarts:
+- With `cache=True`, responses carrying an ETag or Last-Modified header are revalidated with a
+  conditional request (If-None-Match / If-Modified-Since), a 304 answer returns the cached body.
+- With a ttl, cached responses younger than the ttl are returned without a request.
+Caching is meant for small feeds and API responses, not for images. Requests sending credentials
+in their headers (Authorization, API keys, tokens) are never cached.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30
+POOL_MAXSIZE = 10
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+MAX_ENTRY_BYTES = 5 * 1024 * 1024
+
+# Request headers whose name contains one of these carry credentials, such requests are not cached
+SECRET_HEADER_MARKERS = ("authorization", "api-key", "apikey", "token", "secret", "cookie")
+
+
+class HttpClient:
+    """Pooled HTTP session with a conditional-request and TTL response cache.
+
+    Attributes:
+        cache_dir (str): Directory holding the cached responses.
+        max_bytes (int): Total size of the cached bodies before the least recently used are evicted.
+        default_timeout (float): Timeout in seconds applied to requests that do not specify one.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, default_timeout=DEFAULT_TIMEOUT):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.default_timeout = default_timeout
+
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url, params=None, headers=None, timeout=None, ttl=0, cache=False, **kwargs):
+        """Sends a GET request, answering it from the cache when possible.
+
+        Args:
+            url (str): Url to request.
+            params (dict, optional): Query parameters.
+            headers (dict, optional): Request headers.
+            timeout (float, optional): Timeout in seconds, defaults to `default_timeout`.
+            ttl (int, optional): Seconds a cached response is used without contacting the server,
+                a ttl also enables the cache.
+            cache (bool, optional): Set to True to cache the response and revalidate it on later requests.
+
+        Returns:
+            requests.Response: The response. Cached responses have `from_cache` set to True.
+        """
+        if not (cache or ttl) or kwargs.get("stream") or self._has_credentials(headers):
+            return self.request("GET", url, params=params, headers=headers, timeout=timeout, **kwargs)
+
+        key = self._cache_key(url, params, headers)
+        entry = self._load_entry(key)
+        if entry and ttl and time.time() - entry[0]["fetched_at"] < ttl:
+            logger.debug(f"HTTP cache hit: {url}")
+            return self._build_response(*entry)
+
+        request_headers = dict(headers or {})
+        if entry:
+            if entry[0]["headers"].get("ETag"):
+                request_headers["If-None-Match"] = entry[0]["headers"]["ETag"]
+            if entry[0]["headers"].get("Last-Modified"):
+                request_headers["If-Modified-Since"] = entry[0]["headers"]["Last-Modified"]
+
+        response = self.request("GET", url, params=params, headers=request_headers, timeout=timeout, **kwargs)
+        if response.status_code == 304 and entry:
+            logger.debug(f"HTTP cache revalidated: {url}")
+            metadata, body = entry
+            metadata["fetched_at"] = time.time()
+            self._store_entry(key, metadata)
+            return self._build_response(metadata, body)
+
+        if response.status_code == 200 and self._is_cacheable(response, ttl):
+            self._store_entry(key, {
+                "url": self._redact_url(response.url),
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "encoding": response.encoding,
+                "fetched_at": time.time(),
+            }, response.content)
+        return response
+
+    def post(self, url, timeout=None, **kwargs):
+        """Sends a POST request through the pooled session, responses are not cached."""
+        return self.request("POST", url, timeout=timeout, **kwargs)
+
+    def head(self, url, timeout=None, **kwargs):
+        """Sends a HEAD request through the pooled session."""
+        return self.request("HEAD", url, timeout=timeout, **kwargs)
+
+    def request(self, method, url, timeout=None, **kwargs):
+        """Sends a request through the pooled session with the default timeout."""
+        return self.session.request(method, url, timeout=timeout or self.default_timeout, **kwargs)
+
+    def _is_cacheable(self, response, ttl):
+        cache_control = response.headers.get("Cache-Control", "")
+        if "no-store" in cache_control or len(response.content) > MAX_ENTRY_BYTES:
+            return False
+        return bool(ttl or response.headers.get("ETag") or response.headers.get("Last-Modified"))
+
+    @staticmethod
+    def _has_credentials(headers):
+        return any(marker in name.lower() for name in (headers or {}) for marker in SECRET_HEADER_MARKERS)
+
+    def _cache_key(self, url, params, headers):
+        serialized = json.dumps([url, params or {}, headers or {}], sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def _load_entry(self, key):
+        """Returns the (metadata, body) of a cached response, or None if it is not cached."""
+        metadata_path, body_path = self._get_paths(key)
+        try:
+            with open(metadata_path) as f:
+                metadata = json.load(f)
+            with open(body_path, "rb") as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+        return metadata, body
+
+    def _store_entry(self, key, metadata, body=None):
+        """Writes a cached response, only the metadata is rewritten when no body is given."""
+        metadata_path, body_path = self._get_paths(key)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if body is None:
+                os.utime(body_path)
+            else:
+                self._write_atomic(body_path, body)
+            self._write_atomic(metadata_path, json.dumps(metadata).encode("utf-8"))
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Failed to store HTTP response in cache: {e}")
+
+    def _write_atomic(self, path, data):
+        """Writes through a uniquely named temp file, so concurrent fetches of a url can't interleave."""
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _redact_url(url):
+        """Drops the query string, which often carries API keys, from a url stored on disk."""
+        parts = urlsplit(url)
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+
+    def _evict(self):
+        """Removes the least recently used responses until the cache fits in max_bytes."""
+        with self.lock:
+            entries = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".body"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort()
+
+            total_bytes = sum(size for _, size, _ in entries)
+            while entries and total_bytes > self.max_bytes:
+                _, size, body_path = entries.pop(0)
+                for path in (body_path, body_path[:-len(".body")] + ".json"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total_bytes -= size
+
+    def _get_paths(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json"), os.path.join(self.cache_dir, f"{key}.body")
+
+    @staticmethod
+    def _build_response(metadata, body):
+        response = requests.Response()
+        response.status_code = metadata["status_code"]
+        response.headers = CaseInsensitiveDict(metadata["headers"])
+        response.encoding = metadata.get("encoding")
+        response.url = metadata["url"]
+        response.reason = "OK"
+        response._content = body
+        response._content_consumed = True
+        response.from_cache = True
+        return response
+
+
+http_client = HttpClient(resolve_path(os.path.join("cache", "http")))
+
+
+def http_get(url, params=None, headers=None, timeout=None, ttl=0, cache=False, **kwargs):
+    """Sends a GET request through the shared HTTP client, see `HttpClient.get`."""
+    return http_client.get(url, params=params, headers=headers, timeout=timeout, ttl=ttl, cache=cache, **kwargs)
+
+
+def http_post(url, timeout=None, **kwargs):
+    """Sends a POST request through the shared HTTP client."""
+    return http_client.post(url, timeout=timeout, **kwargs)
+
+
+def http_head(url, timeout=None, **kwargs):
+    """Sends a HEAD request through the shared HTTP client."""
+    return http_client.head(url, timeout=timeout, **kwargs)
@@ -1,17 +1,28 @@
-import requests
 from PIL import Image, ImageEnhance, ImageOps, ImageFilter
 from io import BytesIO
 import os
 import logging
-import hashlib
 import tempfile
 import subprocess
-import shutil
+import threading
+from utils.http_client import http_get
+from utils.render_server import render_server, RenderServerError, find_chromium_binary, CHROMIUM_FLAGS
 
 logger = logging.getLogger(__name__)
 
+# tmpfs mount used for the files of the single-use browser fallback
+RAM_TEMP_DIR = "/dev/shm"
+
+# Limits concurrent browser renders, e.g. during playlist warm-up, see set_render_concurrency
+_render_slots = threading.BoundedSemaphore(1)
+
+def set_render_concurrency(limit):
+    """Sets the number of browser renders allowed to run at the same time."""
+    global _render_slots
+    _render_slots = threading.BoundedSemaphore(max(1, int(limit)))
+
 def get_image(image_url):
-    response = requests.get(image_url)
+    response = http_get(image_url)
     img = None
     if 200 <= response.status_code < 300 or response.status_code == 304:
         img = Image.open(BytesIO(response.content))
@@ -31,9 +42,21 @@ def change_orientation(image, orientation, inverted=False):
     return image.rotate(angle, expand=1)
 
 def resize_image(image, desired_size, image_settings=[]):
-    img_width, img_height = image.size
-    desired_width, desired_height = desired_size
-    desired_width, desired_height = int(desired_width), int(desired_height)
+    desired_width, desired_height = int(desired_size[0]), int(desired_size[1])
+
+    # Step 1: Determine crop dimensions
+    crop_box = get_crop_box(image.size, (desired_width, desired_height), image_settings)
+
+    # Step 2: Crop the image
+    image = image.crop(crop_box)
+
+    # Step 3: Resize to the exact desired dimensions (if necessary)
+    return image.resize((desired_width, desired_height), Image.LANCZOS)
+
+def get_crop_box(image_size, desired_size, image_settings=[]):
+    """Returns the box cropping an image of image_size to the aspect ratio of desired_size."""
+    img_width, img_height = image_size
+    desired_width, desired_height = int(desired_size[0]), int(desired_size[1])
 
     img_ratio = img_width / img_height
     desired_ratio = desired_width / desired_height
@@ -42,8 +65,6 @@ def resize_image(image, desired_size, image_settings=[]):
 
     x_offset, y_offset = 0,0
     new_width, new_height = img_width,img_height
-    # Step 1: Determine crop dimensions
-    desired_ratio = desired_width / desired_height
     if img_ratio > desired_ratio:
         # Image is wider than desired aspect ratio
         new_width = int(img_height * desired_ratio)
@@ -55,48 +76,105 @@ def resize_image(image, desired_size, image_settings=[]):
         if not keep_width:
             y_offset = (img_height - new_height) // 2
 
-    # Step 2: Crop the image
-    image = image.crop((x_offset, y_offset, x_offset + new_width, y_offset + new_height))
-
-    # Step 3: Resize to the exact desired dimensions (if necessary)
-    return image.resize((desired_width, desired_height), Image.LANCZOS)
+    return (x_offset, y_offset, x_offset + new_width, y_offset + new_height)
 
 def apply_image_enhancement(img, image_settings={}):
     # Convert image to RGB mode if necessary for enhancement operations
     # ImageEnhance requires RGB mode for operations like blend
     if img.mode not in ('RGB', 'L'):
         img = img.convert('RGB')
-        
 
-    # Apply Brightness
-    img = ImageEnhance.Brightness(img).enhance(image_settings.get("brightness", 1.0))
+    brightness = float(image_settings.get("brightness", 1.0))
+    contrast = float(image_settings.get("contrast", 1.0))
+    saturation = float(image_settings.get("saturation", 1.0))
+    sharpness = float(image_settings.get("sharpness", 1.0))
 
-    # Apply Contrast
-    img = ImageEnhance.Contrast(img).enhance(image_settings.get("contrast", 1.0))
+    # Apply Brightness and Contrast as a single lookup table
+    if brightness != 1.0 or contrast != 1.0:
+        img = img.point(_get_brightness_contrast_lut(img, brightness, contrast) * len(img.getbands()))
 
     # Apply Saturation (Color)
-    img = ImageEnhance.Color(img).enhance(image_settings.get("saturation", 1.0))
+    if saturation != 1.0 and img.mode == 'RGB':
+        img = Image.blend(img.convert('L').convert('RGB'), img, saturation)
 
     # Apply Sharpness
-    img = ImageEnhance.Sharpness(img).enhance(image_settings.get("sharpness", 1.0))
+    if sharpness != 1.0:
+        img = ImageEnhance.Sharpness(img).enhance(sharpness)
 
     return img
 
-def compute_image_hash(image):
-    """Compute SHA-256 hash of an image."""
-    image = image.convert("RGB")
-    img_bytes = image.tobytes()
-    return hashlib.sha256(img_bytes).hexdigest()
+def _get_brightness_contrast_lut(img, brightness, contrast):
+    """Returns a 256 entry table applying brightness then contrast like ImageEnhance does.
+
+    Contrast scales around the mean gray level of the brightened image, which is computed from
+    the histogram instead of a brightened copy of the image.
+    """
+    brightened = [min(255, max(0, int(value * brightness + 0.5))) for value in range(256)]
+    histogram = img.convert('L').histogram() if img.mode != 'L' else img.histogram()
+    pixels = sum(histogram) or 1
+    mean = int(sum(brightened[value] * count for value, count in enumerate(histogram)) / pixels + 0.5)
+    return [min(255, max(0, int(mean + (value - mean) * contrast + 0.5))) for value in brightened]
+
+def prepare_display_image(image, resolution, orientation='horizontal', inverted=False, image_settings=[], enhancements={}):
+    """Rotates, crops, resizes and enhances an image for the display.
+
+    Gives the same result as change_orientation, resize_image, a 180 degree rotation when inverted
+    and apply_image_enhancement, but crops and resizes in one resample and applies the combined
+    rotation as a single lossless transpose, skipping steps that would not change the image.
+
+    Args:
+        image (PIL.Image): The image to prepare.
+        resolution (tuple): Width and height of the display.
+        orientation (str): 'horizontal' or 'vertical', vertical images are rotated 90 degrees.
+        inverted (bool): Whether the image is rotated by 180 degrees for upside down displays.
+        image_settings (list): Image settings, e.g. 'keep-width'.
+        enhancements (dict): Brightness, contrast, saturation and sharpness factors.
+    """
+    desired_width, desired_height = int(resolution[0]), int(resolution[1])
+    quarter_turn = orientation == 'vertical'
+    angle = (90 if quarter_turn else 0) + (180 if inverted else 0)
+
+    # Crop box in the rotated frame, mapped back to the source image
+    width, height = image.size
+    rotated_size = (height, width) if quarter_turn else (width, height)
+    left, top, right, bottom = get_crop_box(rotated_size, (desired_width, desired_height), image_settings)
+    if quarter_turn:
+        box = (width - bottom, left, width - top, right)
+        target_size = (desired_height, desired_width)
+    else:
+        box = (left, top, right, bottom)
+        target_size = (desired_width, desired_height)
+
+    if box != (0, 0, width, height) or target_size != image.size:
+        image = image.resize(target_size, Image.LANCZOS, box=box)
+
+    if angle % 360:
+        image = image.transpose({90: Image.Transpose.ROTATE_90,
+                                 180: Image.Transpose.ROTATE_180,
+                                 270: Image.Transpose.ROTATE_270}[angle])
+
+    return apply_image_enhancement(image, enhancements)
 
 def take_screenshot_html(html_str, dimensions, timeout_ms=None):
+    with _render_slots:
+        return _take_screenshot_html(html_str, dimensions, timeout_ms)
+
+def _take_screenshot_html(html_str, dimensions, timeout_ms=None):
+    if render_server.enabled:
+        try:
+            # rendered in memory, nothing is written to the SD card
+            return render_server.screenshot_html(html_str, dimensions, timeout_ms)
+        except RenderServerError as e:
+            logger.warning(f"Render server unavailable, falling back to a single-use browser: {str(e)}")
+
     image = None
     try:
         # Create a temporary HTML file
-        with tempfile.NamedTemporaryFile(suffix=".html", delete=False) as html_file:
+        with tempfile.NamedTemporaryFile(suffix=".html", dir=_get_temp_dir(), delete=False) as html_file:
             html_file.write(html_str.encode("utf-8"))
             html_file_path = html_file.name
 
-        image = take_screenshot(html_file_path, dimensions, timeout_ms)
+        image = _take_screenshot_subprocess(html_file_path, dimensions, timeout_ms)
 
         # Remove html file
         os.remove(html_file_path)
@@ -106,50 +184,38 @@ def take_screenshot_html(html_str, dimensions, timeout_ms=None):
 
     return image
 
-def _find_chromium_binary():
-    """Find the first available Chromium-based binary in system PATH."""
-    candidates = ["chromium-headless-shell", "chromium", "chrome"]
-    for candidate in candidates:
-        path = shutil.which(candidate)
-        if path:
-            logger.debug(f"Found browser binary: {candidate} at {path}")
-            return candidate
-    return None
+def take_screenshot(target, dimensions, timeout_ms=None):
+    with _render_slots:
+        return _take_screenshot(target, dimensions, timeout_ms)
 
+def _take_screenshot(target, dimensions, timeout_ms=None):
+    if render_server.enabled:
+        try:
+            return render_server.screenshot(target, dimensions, timeout_ms)
+        except RenderServerError as e:
+            logger.warning(f"Render server unavailable, falling back to a single-use browser: {str(e)}")
 
-def take_screenshot(target, dimensions, timeout_ms=None):
+    return _take_screenshot_subprocess(target, dimensions, timeout_ms)
+
+def _take_screenshot_subprocess(target, dimensions, timeout_ms=None):
     image = None
     try:
         # Find available browser binary
-        browser = _find_chromium_binary()
+        browser = find_chromium_binary()
         if not browser:
             logger.error("No Chromium-based browser found. Install chromium, chromium-headless-shell, or chrome.")
             return None
 
         # Create a temporary output file for the screenshot
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as img_file:
+        with tempfile.NamedTemporaryFile(suffix=".png", dir=_get_temp_dir(), delete=False) as img_file:
             img_file_path = img_file.name
 
         command = [
             browser,
             target,
-            "--headless",
             f"--screenshot={img_file_path}",
             f"--window-size={dimensions[0]},{dimensions[1]}",
-            "--disable-dev-shm-usage",
-            "--disable-gpu",
-            "--use-gl=swiftshader",
-            "--hide-scrollbars",
-            "--in-process-gpu",
-            "--js-flags=--jitless",
-            "--disable-zero-copy",
-            "--disable-gpu-memory-buffer-compositor-resources",
-            "--disable-extensions",
-            "--disable-plugins",
-            "--mute-audio",
-            "--renderer-process-limit=1",
-            "--no-zygote",
-            "--no-sandbox"
+            *CHROMIUM_FLAGS
         ]
         if timeout_ms:
             command.append(f"--timeout={timeout_ms}")
@@ -172,6 +238,12 @@ def take_screenshot(target, dimensions, timeout_ms=None):
 
     return image
 
+def _get_temp_dir():
+    """Returns a RAM backed directory for temporary render files if available, to spare the SD card."""
+    if os.path.isdir(RAM_TEMP_DIR) and os.access(RAM_TEMP_DIR, os.W_OK):
+        return RAM_TEMP_DIR
+    return None
+
 def pad_image_blur(img: Image, dimensions: tuple[int, int]) -> Image:
     bkg = ImageOps.fit(img, dimensions)
     bkg = bkg.filter(ImageFilter.BoxBlur(8))
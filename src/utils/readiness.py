@@ -0,0 +1,88 @@
+"""
+Readiness
+
+Tracks the subsystems initialized in the background at startup, so the web server can start
+serving right away. Routes that depend on a subsystem wait for it with `wait_for`, which raises
+`SubsystemNotReady` when it fails or takes too long; the app turns that into a 503 response.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request waits for a subsystem before giving up
+DEFAULT_WAIT_SECONDS = 30
+
+PENDING = "pending"
+READY = "ready"
+FAILED = "failed"
+
+
+class SubsystemNotReady(RuntimeError):
+    """Raised when a request needs a subsystem that is still initializing or failed to initialize."""
+
+    def __init__(self, name, status, error=None):
+        self.name = name
+        self.status = status
+        self.error = error
+        message = f"{name} failed to initialize: {error}" if status == FAILED else f"{name} is still initializing"
+        super().__init__(message)
+
+
+class Readiness:
+    """Status of each background-initialized subsystem."""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.started_at = time.monotonic()
+        self.subsystems = {}
+
+    def register(self, *names):
+        """Declares subsystems that will be initialized, requests for them wait until they are."""
+        with self.condition:
+            for name in names:
+                self.subsystems.setdefault(name, {"status": PENDING, "error": None, "seconds": None})
+
+    def mark_ready(self, name):
+        self._set(name, READY)
+        logger.info(f"Subsystem ready: {name}")
+
+    def mark_failed(self, name, error):
+        self._set(name, FAILED, str(error))
+        logger.error(f"Subsystem failed to initialize: {name} | error: {error}")
+
+    def _set(self, name, status, error=None):
+        with self.condition:
+            self.subsystems[name] = {
+                "status": status,
+                "error": error,
+                "seconds": round(time.monotonic() - self.started_at, 3),
+            }
+            self.condition.notify_all()
+
+    def is_ready(self, name):
+        """Returns True if the subsystem finished initializing, unregistered subsystems count as ready."""
+        with self.condition:
+            return self.subsystems.get(name, {"status": READY})["status"] == READY
+
+    def wait_for(self, name, timeout=DEFAULT_WAIT_SECONDS):
+        """Blocks until the subsystem is ready, raises SubsystemNotReady if it failed or the timeout expired."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.subsystems.get(name, {"status": READY})["status"] != PENDING, timeout=timeout)
+            subsystem = self.subsystems.get(name, {"status": READY})
+            if subsystem["status"] != READY:
+                raise SubsystemNotReady(name, subsystem["status"], subsystem["error"])
+
+    def get_status(self):
+        """Returns the status of every subsystem and whether all are ready."""
+        with self.condition:
+            subsystems = {name: dict(subsystem) for name, subsystem in self.subsystems.items()}
+        return {
+            "ready": all(subsystem["status"] == READY for subsystem in subsystems.values()),
+            "subsystems": subsystems,
+        }
+
+
+readiness = Readiness()
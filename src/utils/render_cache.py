@@ -0,0 +1,159 @@
+"""
+Render Cache
+
+Content-addressed cache of rendered plugin templates. Templates rendered with the same
+parameters and dimensions produce the same screenshot, so the PNG is stored on disk keyed by
+a hash of those inputs and returned on later renders without starting the browser.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from PIL import Image
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+class RenderCache:
+    """Size-bounded on-disk LRU cache of rendered images.
+
+    Entries are PNG files named by their key. A file's modification time records its last use,
+    it is updated on every hit and the least recently used files are evicted first.
+
+    Attributes:
+        cache_dir (str): Directory holding the cached images.
+        max_bytes (int): Total size of the cached images before old entries are evicted.
+        max_age_seconds (int): Entries last used longer ago than this are treated as misses.
+        hits (int): Number of renders served from the cache.
+        misses (int): Number of renders not found in the cache.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES, max_age_seconds=DEFAULT_MAX_AGE_SECONDS, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.enabled = enabled
+
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, enabled=True, max_bytes=DEFAULT_MAX_BYTES, max_age_seconds=DEFAULT_MAX_AGE_SECONDS):
+        """Updates the cache settings."""
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+
+    @staticmethod
+    def make_key(template_name, source_dirs, css_files, template_params, dimensions):
+        """Computes a stable key for a render from its template, stylesheets, parameters and dimensions.
+
+        The modification times of the template directories and stylesheets are part of the key,
+        so editing any of them invalidates the renders that used them.
+        """
+        key_data = {
+            "template": template_name,
+            "sources": [_mtimes(source_dir) for source_dir in source_dirs],
+            "css": [(css_file, _mtime(css_file)) for css_file in css_files],
+            "params": template_params,
+            "dimensions": list(dimensions),
+        }
+        serialized = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Returns the cached image for the key, or None on a miss."""
+        path = self._get_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                raise FileNotFoundError(path)
+            with Image.open(path) as img:
+                image = img.copy()
+            os.utime(path)
+        except (OSError, ValueError):
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+        logger.info(f"Render cache hit. | hits: {self.hits} | misses: {self.misses}")
+        return image
+
+    def put(self, key, image):
+        """Stores a rendered image under the key and evicts old entries if the cache is full."""
+        path = self._get_path(key)
+        temp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            image.save(temp_path, format="PNG")
+            os.replace(temp_path, path)
+            self._evict()
+        except OSError as e:
+            logger.warning(f"Failed to store render in cache: {e}")
+
+    def get_stats(self):
+        """Returns the hit and miss counters and the current size of the cache."""
+        entries = self._list_entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+        }
+
+    def _evict(self):
+        """Removes the least recently used entries until the cache fits in max_bytes."""
+        with self.lock:
+            entries = sorted(self._list_entries(), key=lambda entry: entry[2])
+            total_bytes = sum(size for _, size, _ in entries)
+            while entries and total_bytes > self.max_bytes:
+                path, size, _ = entries.pop(0)
+                try:
+                    os.remove(path)
+                    total_bytes -= size
+                except OSError:
+                    pass
+
+    def _list_entries(self):
+        """Returns (path, size, last used) of each cached image."""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".png"):
+                        stat = entry.stat()
+                        entries.append((entry.path, stat.st_size, stat.st_mtime))
+        except OSError:
+            pass
+        return entries
+
+    def _get_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _mtimes(directory):
+    """Returns the modification times of the files in a directory, keyed by file name."""
+    try:
+        with os.scandir(directory) as it:
+            return sorted((entry.name, entry.stat().st_mtime) for entry in it if entry.is_file())
+    except OSError:
+        return []
+
+
+render_cache = RenderCache(resolve_path(os.path.join("static", "images", "render_cache")))
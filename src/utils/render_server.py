@@ -0,0 +1,374 @@
+"""
+Chromium Render Server
+
+Keeps a single headless Chromium process alive between renders and drives it over the
+DevTools protocol, instead of cold-starting a new browser for every screenshot.
+The browser is connected through --remote-debugging-pipe, so no debugging port is opened.
+"""
+
+import base64
+import fcntl
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from io import BytesIO
+
+from PIL import Image
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+BROWSER_CANDIDATES = ["chromium-headless-shell", "chromium", "chrome"]
+
+CHROMIUM_FLAGS = [
+    "--headless",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--use-gl=swiftshader",
+    "--hide-scrollbars",
+    "--in-process-gpu",
+    "--js-flags=--jitless",
+    "--disable-zero-copy",
+    "--disable-gpu-memory-buffer-compositor-resources",
+    "--disable-extensions",
+    "--disable-plugins",
+    "--mute-audio",
+    "--renderer-process-limit=1",
+    "--no-zygote",
+    "--no-sandbox"
+]
+
+DEFAULT_IDLE_TIMEOUT = 300
+DEFAULT_LOAD_TIMEOUT_MS = 30000
+STARTUP_TIMEOUT = 30
+COMMAND_TIMEOUT = 30
+HEALTH_CHECK_TIMEOUT = 2
+
+# Execs the browser with the pipe ends given as the first two arguments moved onto fds 3 and 4.
+# Running this in a separate interpreter keeps the fd mapping out of the forked child of this
+# multi-threaded process, where only exec is safe, while close_fds stops other fds from leaking.
+PIPE_LAUNCHER = (
+    "import os, sys\n"
+    "read_fd, write_fd = int(sys.argv[1]), int(sys.argv[2])\n"
+    "os.dup2(read_fd, 3)\n"
+    "os.dup2(write_fd, 4)\n"
+    "os.close(read_fd)\n"
+    "os.close(write_fd)\n"
+    "os.execvp(sys.argv[3], sys.argv[3:])\n"
+)
+
+# Resolves once the page has loaded and its web fonts are ready
+FONTS_READY_EXPRESSION = "document.fonts.ready.then(() => true)"
+DOCUMENT_READY_EXPRESSION = """
+new Promise(resolve => document.readyState === "complete" ? resolve() : window.addEventListener("load", resolve))
+    .then(() => document.fonts.ready)
+    .then(() => true)
+"""
+
+# In-memory documents are written into this page so they keep a file:// origin and can load local resources
+BLANK_PAGE_URL = f"file://{resolve_path(os.path.join('static', 'blank.html'))}"
+
+
+def find_chromium_binary():
+    """Find the first available Chromium-based binary in system PATH."""
+    for candidate in BROWSER_CANDIDATES:
+        path = shutil.which(candidate)
+        if path:
+            logger.debug(f"Found browser binary: {candidate} at {path}")
+            return candidate
+    return None
+
+
+class RenderServerError(Exception):
+    """Raised when the render server cannot produce a screenshot."""
+
+
+class ChromiumRenderServer:
+    """Long-lived headless Chromium instance used to take screenshots.
+
+    The browser is started on the first render and shut down again after `idle_timeout` seconds
+    without renders to free memory. A failed health check or protocol error restarts the browser.
+    Renders are serialized, only one page is open at a time.
+    """
+
+    def __init__(self, idle_timeout=DEFAULT_IDLE_TIMEOUT, enabled=True):
+        self.idle_timeout = idle_timeout
+        self.enabled = enabled
+
+        self.lock = threading.RLock()
+        self.process = None
+        self.command_fd = None
+        self.response_fd = None
+        self.idle_timer = None
+
+        self._buffer = b""
+        self._events = []
+        self._next_id = 0
+
+    def configure(self, enabled=True, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        """Updates the server settings, shutting the browser down if it has been disabled."""
+        self.enabled = enabled
+        self.idle_timeout = idle_timeout
+        if not enabled:
+            self.shutdown()
+
+    def screenshot(self, url, dimensions, timeout_ms=None):
+        """Loads the url in a new page and returns a screenshot of it as a PIL Image.
+
+        Args:
+            url (str): Url or file path of the page to render.
+            dimensions (tuple): Viewport (width, height) in pixels.
+            timeout_ms (int, optional): Maximum time to wait for the page to load before capturing it.
+
+        Raises:
+            RenderServerError: If the browser could not render the page, even after a restart.
+        """
+        if os.path.exists(url):
+            url = f"file://{os.path.abspath(url)}"
+        return self._render(url, dimensions, timeout_ms)
+
+    def screenshot_html(self, html, dimensions, timeout_ms=None):
+        """Renders an html document held in memory and returns a screenshot of it as a PIL Image.
+
+        Neither the document nor the screenshot touch the disk. The document is written into a
+        blank file:// page, so absolute paths to local stylesheets, fonts and images still resolve.
+
+        Raises:
+            RenderServerError: If the browser could not render the document, even after a restart.
+        """
+        return self._render(BLANK_PAGE_URL, dimensions, timeout_ms, html=html)
+
+    def _render(self, url, dimensions, timeout_ms, html=None):
+        """Captures the page with the render lock held, restarting the browser once if it fails."""
+        if not self.process and not find_chromium_binary():
+            raise RenderServerError("No Chromium-based browser found.")
+
+        with self.lock:
+            self._cancel_idle_timer()
+            try:
+                for attempt in range(2):
+                    try:
+                        self._ensure_running()
+                        return self._capture(url, dimensions, timeout_ms or DEFAULT_LOAD_TIMEOUT_MS, html)
+                    except (RenderServerError, OSError) as e:
+                        logger.warning(f"Render server failed, restarting browser. | attempt: {attempt + 1} | error: {e}")
+                        self._stop_process()
+                raise RenderServerError("Render server failed to take screenshot")
+            finally:
+                self._start_idle_timer()
+
+    def is_healthy(self):
+        """Returns True if the browser process is running and responding to commands."""
+        with self.lock:
+            if not self.process or self.process.poll() is not None:
+                return False
+            try:
+                self._send("Browser.getVersion", timeout=HEALTH_CHECK_TIMEOUT)
+                return True
+            except (RenderServerError, OSError):
+                return False
+
+    def shutdown(self):
+        """Closes the browser if it is running."""
+        with self.lock:
+            self._cancel_idle_timer()
+            if self.process:
+                logger.info("Shutting down render server")
+                self._stop_process()
+
+    def _capture(self, url, dimensions, timeout_ms, html=None):
+        """Opens a page for the url, optionally replaces its content with html, waits for it to load and captures a screenshot."""
+        width, height = int(dimensions[0]), int(dimensions[1])
+        self._events = []
+
+        target_id = self._send("Target.createTarget", {"url": "about:blank"})["targetId"]
+        try:
+            session_id = self._send("Target.attachToTarget", {"targetId": target_id, "flatten": True})["sessionId"]
+            self._send("Emulation.setDeviceMetricsOverride",
+                       {"width": width, "height": height, "deviceScaleFactor": 1, "mobile": False}, session_id)
+            self._send("Emulation.setScrollbarsHidden", {"hidden": True}, session_id)
+            self._send("Page.enable", session_id=session_id)
+
+            deadline = time.monotonic() + timeout_ms / 1000
+            result = self._send("Page.navigate", {"url": url}, session_id)
+            if result.get("errorText"):
+                raise RenderServerError(f"Failed to load {url}: {result['errorText']}")
+
+            if not self._wait_for_event("Page.loadEventFired", session_id, deadline):
+                logger.warning(f"Page did not finish loading within {timeout_ms}ms, taking screenshot anyway.")
+            elif html is None:
+                self._evaluate(FONTS_READY_EXPRESSION, session_id, deadline)
+            else:
+                self._send("Page.setDocumentContent", {"frameId": result["frameId"], "html": html}, session_id)
+                self._evaluate(DOCUMENT_READY_EXPRESSION, session_id, deadline)
+
+            data = self._send("Page.captureScreenshot", {"format": "png"}, session_id)["data"]
+        finally:
+            self._send("Target.closeTarget", {"targetId": target_id})
+
+        with Image.open(BytesIO(base64.b64decode(data))) as img:
+            return img.copy()
+
+    def _evaluate(self, expression, session_id, deadline):
+        """Evaluates a javascript expression in the page, waiting for the returned promise until the deadline."""
+        try:
+            self._send("Runtime.evaluate", {"expression": expression, "awaitPromise": True, "returnByValue": True},
+                       session_id, timeout=max(deadline - time.monotonic(), 0))
+        except RenderServerError as e:
+            logger.warning(f"Page evaluation did not complete: {e}")
+
+    def _ensure_running(self):
+        """Starts the browser if it is not running or fails the health check."""
+        if self.process and self.process.poll() is None:
+            try:
+                self._send("Browser.getVersion", timeout=HEALTH_CHECK_TIMEOUT)
+                return
+            except (RenderServerError, OSError):
+                logger.warning("Render server failed health check, restarting browser.")
+                self._stop_process()
+
+        browser = find_chromium_binary()
+        if not browser:
+            raise RenderServerError("No Chromium-based browser found.")
+
+        # the browser reads commands from fd 3 and writes responses to fd 4, the child's ends are
+        # moved above fd 4 so the launcher can map them without overwriting one with the other
+        command_read, command_write = os.pipe()
+        response_read, response_write = os.pipe()
+        child_read = fcntl.fcntl(command_read, fcntl.F_DUPFD_CLOEXEC, 10)
+        child_write = fcntl.fcntl(response_write, fcntl.F_DUPFD_CLOEXEC, 10)
+        os.close(command_read)
+        os.close(response_write)
+
+        logger.info(f"Starting render server. | browser: {browser}")
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, "-c", PIPE_LAUNCHER, str(child_read), str(child_write),
+                 browser, *CHROMIUM_FLAGS, "--remote-debugging-pipe", "about:blank"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=True,
+                pass_fds=(child_read, child_write)
+            )
+        finally:
+            os.close(child_read)
+            os.close(child_write)
+
+        self.command_fd = command_write
+        self.response_fd = response_read
+        self._buffer = b""
+        self._events = []
+        self._send("Browser.getVersion", timeout=STARTUP_TIMEOUT)
+
+    def _stop_process(self):
+        """Closes the browser, killing it if it does not exit on its own, and releases the pipes."""
+        process, self.process = self.process, None
+        if process and process.poll() is None:
+            try:
+                self._write({"id": self._message_id(), "method": "Browser.close"})
+                process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                process.kill()
+                process.wait()
+
+        for fd in (self.command_fd, self.response_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self.command_fd = None
+        self.response_fd = None
+
+    def _send(self, method, params=None, session_id=None, timeout=COMMAND_TIMEOUT):
+        """Sends a DevTools protocol command and waits for its result."""
+        message_id = self._message_id()
+        message = {"id": message_id, "method": method, "params": params or {}}
+        if session_id:
+            message["sessionId"] = session_id
+        self._write(message)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            message = self._read(deadline)
+            if message is None:
+                raise RenderServerError(f"Timed out waiting for {method}")
+            if message.get("id") == message_id:
+                if "error" in message:
+                    raise RenderServerError(f"{method} failed: {message['error'].get('message')}")
+                return message.get("result", {})
+            if "method" in message:
+                self._events.append(message)
+
+    def _wait_for_event(self, method, session_id, deadline):
+        """Waits until the deadline for an event from the session, returns True if it was received."""
+        while True:
+            for event in self._events:
+                if event.get("method") == method and event.get("sessionId") == session_id:
+                    return True
+            message = self._read(deadline)
+            if message is None:
+                return False
+            if "method" in message:
+                self._events.append(message)
+
+    def _message_id(self):
+        self._next_id += 1
+        return self._next_id
+
+    def _write(self, message):
+        if self.command_fd is None:
+            raise RenderServerError("Render server is not running")
+        data = json.dumps(message).encode("utf-8") + b"\0"
+        while data:
+            written = os.write(self.command_fd, data)
+            data = data[written:]
+
+    def _read(self, deadline):
+        """Reads the next null-terminated message from the browser, or None if the deadline passes."""
+        while b"\0" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            ready, _, _ = select.select([self.response_fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(self.response_fd, 65536)
+            if not chunk:
+                raise RenderServerError("Browser closed the DevTools pipe")
+            self._buffer += chunk
+
+        message, self._buffer = self._buffer.split(b"\0", 1)
+        try:
+            return json.loads(message)
+        except ValueError as e:
+            raise RenderServerError(f"Invalid message from browser: {e}")
+
+    def _start_idle_timer(self):
+        if self.process and self.idle_timeout:
+            self.idle_timer = threading.Timer(self.idle_timeout, self._on_idle)
+            self.idle_timer.daemon = True
+            self.idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        if self.idle_timer:
+            self.idle_timer.cancel()
+            self.idle_timer = None
+
+    def _on_idle(self):
+        with self.lock:
+            # a render may have started while this timer was waiting for the lock
+            if threading.current_thread() is not self.idle_timer:
+                return
+            logger.info(f"Render server idle for {self.idle_timeout}s, shutting down browser to free memory.")
+            self.shutdown()
+
+
+render_server = ChromiumRenderServer()
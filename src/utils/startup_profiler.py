@@ -0,0 +1,165 @@
+"""
+Startup Profiler
+
+Records where boot time goes so regressions can be tracked between releases:
+- phases: wall time of each named startup step, see `StartupProfiler.phase`.
+- imports: time spent executing modules, grouped by top-level package. Like `python -X importtime`
+  each module's own time excludes the modules it imports, so the package totals add up to the
+  total import time.
+
+The import timer is a meta path finder that wraps the `exec_module` of the loaders found by the
+regular finders, it must be installed before the imports it should measure. Only the standard
+library is used here so it can be imported first.
+"""
+
+import logging
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Number of packages listed in the logged report
+LOGGED_PACKAGES = 15
+
+
+class _ImportTimer:
+    """Meta path finder timing the execution of every module imported after it is installed."""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self.local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        finding = self.local.__dict__.setdefault("finding", set())
+        if fullname in finding:
+            return None
+
+        finding.add(fullname)
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            finding.discard(fullname)
+
+        loader = spec.loader
+        # builtin and frozen modules use their importer class as loader, which can't be wrapped per module
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self._timed(loader.exec_module, fullname)
+        return spec
+
+    def _timed(self, exec_module, fullname):
+        def timed_exec_module(module):
+            stack = self.local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.profiler.record_import(fullname, elapsed - nested)
+        return timed_exec_module
+
+
+class StartupProfiler:
+    """Collects startup phase timings and import costs.
+
+    Attributes:
+        started_at (float): perf_counter value when the profiler was created.
+        phases (list): (name, seconds) of each finished phase in order.
+        imports (dict): Seconds spent executing modules by top-level package.
+        finished (bool): Whether `finish()` was called.
+    """
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.lock = threading.Lock()
+        self.phases = []
+        self.imports = {}
+        self.import_count = 0
+        self.finished = False
+        self.total_seconds = None
+        self.import_timer = None
+
+    def install_import_timer(self):
+        """Starts timing imports, call before the imports to measure."""
+        if self.import_timer is None:
+            self.import_timer = _ImportTimer(self)
+            sys.meta_path.insert(0, self.import_timer)
+
+    def uninstall_import_timer(self):
+        """Stops timing imports, later imports such as lazily loaded plugins are not counted."""
+        if self.import_timer in sys.meta_path:
+            sys.meta_path.remove(self.import_timer)
+        self.import_timer = None
+
+    def record_import(self, fullname, seconds):
+        package = fullname.split(".")[0]
+        with self.lock:
+            self.imports[package] = self.imports.get(package, 0.0) + seconds
+            self.import_count += 1
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed startup step."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - start)
+
+    def add_phase(self, name, seconds):
+        """Records a phase timed elsewhere, e.g. by a background thread."""
+        with self.lock:
+            self.phases.append((name, seconds))
+
+    def mark(self, name, since=None):
+        """Records a phase lasting from `since` (a perf_counter value, defaults to the start) until now."""
+        self.add_phase(name, time.perf_counter() - (since if since is not None else self.started_at))
+
+    def finish(self):
+        """Ends profiling and logs the report, called once the web server is about to serve."""
+        if self.finished:
+            return
+        self.uninstall_import_timer()
+        self.total_seconds = time.perf_counter() - self.started_at
+        self.finished = True
+
+        report = self.get_report()
+        phases = ", ".join(f"{phase['name']}: {phase['seconds']:.2f}s" for phase in report["phases"])
+        packages = ", ".join(f"{package['package']}: {package['seconds']:.2f}s"
+                             for package in report["imports"]["packages"][:LOGGED_PACKAGES])
+        logger.info(f"Startup finished in {self.total_seconds:.2f}s | phases: {phases}")
+        logger.info(f"Startup imports took {report['imports']['total_seconds']:.2f}s "
+                    f"({report['imports']['modules']} modules) | slowest packages: {packages}")
+
+    def get_report(self):
+        """Returns the phase timings and import costs, slowest packages first."""
+        with self.lock:
+            phases = [{"name": name, "seconds": round(seconds, 4)} for name, seconds in self.phases]
+            packages = sorted(self.imports.items(), key=lambda item: item[1], reverse=True)
+            import_count = self.import_count
+
+        return {
+            "finished": self.finished,
+            "total_seconds": round(self.total_seconds, 4) if self.total_seconds is not None else None,
+            "phases": phases,
+            "imports": {
+                "total_seconds": round(sum(seconds for _, seconds in packages), 4),
+                "modules": import_count,
+                "packages": [{"package": package, "seconds": round(seconds, 4)} for package, seconds in packages],
+            },
+        }
+
+
+startup_profiler = StartupProfiler()
@@ -0,0 +1,87 @@
+"""
+State Store
+
+Keeps the runtime state that changes on every refresh (latest refresh info, playlist positions,
+plugin instance refresh times and indexes) out of device.json, so a refresh no longer rewrites the
+whole user configuration. State is stored in SQLite in WAL mode as JSON values keyed by path,
+e.g. "playlist/Default/current_plugin_index". Only keys whose value changed are written.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class StateStore:
+    """Key-value store of runtime state backed by SQLite.
+
+    Attributes:
+        path (str): Path of the SQLite database.
+        values (dict): Last saved value of every key, used to write only what changed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.values = {}
+        self.connection = None
+        try:
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            # WAL stays consistent after a power cut with NORMAL, at worst the last writes are lost
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self.connection.commit()
+            self.values = {
+                key: json.loads(value) for key, value in self.connection.execute("SELECT key, value FROM state")
+            }
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Failed to open state store at {path}, keeping runtime state in the device config: {e}")
+            self.connection = None
+
+    @property
+    def available(self):
+        """Whether the database could be opened, runtime state is only persisted when it is."""
+        return self.connection is not None
+
+    def is_empty(self):
+        """Returns True if no state was saved yet, e.g. before migrating state out of device.json."""
+        return not self.values
+
+    def get(self, key, default=None):
+        """Returns the saved value of a key."""
+        return self.values.get(key, default)
+
+    def save(self, values):
+        """Replaces the stored state with `values`, writing only the keys that changed.
+
+        Keys missing from `values`, e.g. of deleted playlists, are removed.
+
+        Returns:
+            bool: False if the state could not be written.
+        """
+        with self.lock:
+            changed = {key: value for key, value in values.items() if self.values.get(key) != value or key not in self.values}
+            removed = [key for key in self.values if key not in values]
+            if not changed and not removed:
+                return True
+
+            if self.connection:
+                try:
+                    with self.connection:
+                        self.connection.executemany(
+                            "INSERT INTO state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                            [(key, json.dumps(value)) for key, value in changed.items()])
+                        self.connection.executemany("DELETE FROM state WHERE key = ?", [(key,) for key in removed])
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to save runtime state: {e}")
+                    return False
+
+            logger.debug(f"Saved runtime state. | changed: {len(changed)} | removed: {len(removed)}")
+            self.values.update(changed)
+            for key in removed:
+                del self.values[key]
+            return self.connection is not None
@@ -0,0 +1,93 @@
+"""
+Static Frames
+
+On-disk cache of frames drawn by the app itself that rarely change, such as the startup splash.
+A frame only depends on its dimensions and a few inputs (e.g. hostname and IP address), so it is
+stored as a PNG keyed by a hash of those inputs and the source of the function drawing it, and is
+only drawn again when one of them changes.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+import threading
+
+from PIL import Image
+from utils.app_utils import resolve_path
+
+logger = logging.getLogger(__name__)
+
+
+class StaticFrames:
+    """Cache of static frames, holding the latest version of each frame.
+
+    Attributes:
+        cache_dir (str): Directory holding the cached frames.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name, dimensions, render, inputs):
+        """Computes the key of a frame from its dimensions, inputs and the module drawing it.
+
+        The modification time of the module is part of the key, so changing how a frame is drawn
+        invalidates the cached version.
+        """
+        module = sys.modules.get(render.__module__)
+        key_data = {
+            "frame": name,
+            "render": f"{render.__module__}.{render.__qualname__}",
+            "source": _mtime(getattr(module, "__file__", None)),
+            "dimensions": list(dimensions),
+            "inputs": inputs,
+        }
+        serialized = json.dumps(key_data, sort_keys=True, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()[:16]
+
+    def get(self, name, dimensions, render, **inputs):
+        """Returns the frame drawn by `render(dimensions, **inputs)`, from disk when the inputs are unchanged."""
+        key = self.make_key(name, dimensions, render, inputs)
+        path = os.path.join(self.cache_dir, f"{name}-{key}.png")
+        try:
+            with Image.open(path) as img:
+                image = img.copy()
+            logger.debug(f"Using cached frame. | frame: {name} | path: {path}")
+            return image
+        except (OSError, ValueError):
+            pass
+
+        logger.info(f"Drawing frame. | frame: {name} | dimensions: {dimensions}")
+        image = render(dimensions, **inputs)
+        self._store(name, path, image)
+        return image
+
+    def _store(self, name, path, image):
+        """Saves a frame and removes the previous versions of it."""
+        temp_path = f"{path}.tmp"
+        with self.lock:
+            try:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                image.save(temp_path, format="PNG")
+                os.replace(temp_path, path)
+                with os.scandir(self.cache_dir) as it:
+                    stale = [entry.path for entry in it
+                             if entry.name.startswith(f"{name}-") and entry.path != path]
+                for stale_path in stale:
+                    os.remove(stale_path)
+            except OSError as e:
+                logger.warning(f"Failed to store frame in cache: {e}")
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except (OSError, TypeError):
+        return None
+
+
+static_frames = StaticFrames(resolve_path(os.path.join("static", "images", "frames")))
@@ -0,0 +1,92 @@
+import os
+import stat
+import threading
+import time
+
+from src.utils.config_writer import ConfigWriter
+
+
+def wait_for_writer(writer):
+    thread = writer.thread
+    if thread:
+        thread.join(timeout=5)
+
+
+class TestConfigWriter:
+
+    def test_burst_of_writes_is_coalesced(self, tmp_path):
+        path = tmp_path / "device.json"
+        writer = ConfigWriter(str(path), delay_seconds=0.05)
+
+        for i in range(5):
+            writer.write(f'{{"version": {i}}}')
+        wait_for_writer(writer)
+
+        assert path.read_text() == '{"version": 4}'
+        assert writer.writes == 1
+
+    def test_unchanged_content_is_not_written(self, tmp_path):
+        path = tmp_path / "device.json"
+        path.write_text("{}")
+        writer = ConfigWriter(str(path), delay_seconds=0)
+
+        writer.write("{}")
+        wait_for_writer(writer)
+
+        assert writer.writes == 0
+        assert writer.skipped == 1
+
+    def test_flush_writes_pending_content(self, tmp_path):
+        path = tmp_path / "device.json"
+        writer = ConfigWriter(str(path), delay_seconds=60)
+
+        writer.write('{"a": 1}')
+        writer.flush()
+
+        assert path.read_text() == '{"a": 1}'
+        assert writer.writes == 1
+
+    def test_flush_waits_for_write_in_progress(self, tmp_path):
+        path = tmp_path / "device.json"
+        writer = ConfigWriter(str(path), delay_seconds=0)
+        started = threading.Event()
+        copy_mode = writer._copy_mode
+
+        def slow_copy_mode(tmp_path):
+            started.set()
+            time.sleep(0.2)
+            copy_mode(tmp_path)
+
+        writer._copy_mode = slow_copy_mode
+        writer.write('{"a": 1}')
+        assert started.wait(timeout=5)
+        writer.flush()
+
+        assert path.read_text() == '{"a": 1}'
+        assert writer.writes == 1
+
+    def test_write_after_writer_thread_finished_is_written(self, tmp_path):
+        path = tmp_path / "device.json"
+        writer = ConfigWriter(str(path), delay_seconds=0)
+
+        writer.write('{"a": 1}')
+        wait_for_writer(writer)
+        assert writer.thread is None
+
+        writer.write('{"a": 2}')
+        wait_for_writer(writer)
+
+        assert path.read_text() == '{"a": 2}'
+        assert writer.writes == 2
+
+    def test_file_mode_is_kept(self, tmp_path):
+        path = tmp_path / "device.json"
+        path.write_text("{}")
+        os.chmod(path, 0o644)
+        writer = ConfigWriter(str(path), delay_seconds=0)
+
+        writer.write('{"a": 1}')
+        wait_for_writer(writer)
+
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o644
+        assert [entry.name for entry in tmp_path.iterdir()] == ["device.json"]
@@ -0,0 +1,107 @@
+import requests
+
+from utils.http_client import HttpClient
+
+
+def make_response(status_code=200, body=b"", headers=None, url="https://example.com/feed"):
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response.url = url
+    response._content = body
+    return response
+
+
+class FakeServer:
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.requests.append(kwargs.get("headers") or {})
+        return self.responses.pop(0)
+
+
+def make_client(tmp_path, server):
+    client = HttpClient(str(tmp_path / "http"))
+    client.session.request = server.request
+    return client
+
+
+class TestHttpClient:
+
+    def test_responses_are_not_cached_by_default(self, tmp_path):
+        server = FakeServer(make_response(body=b"a", headers={"ETag": '"1"'}))
+        client = make_client(tmp_path, server)
+
+        client.get("https://example.com/feed")
+
+        assert not (tmp_path / "http").exists()
+
+    def test_cached_response_is_revalidated(self, tmp_path):
+        server = FakeServer(
+            make_response(body=b"feed", headers={"ETag": '"1"'}),
+            make_response(status_code=304),
+        )
+        client = make_client(tmp_path, server)
+
+        client.get("https://example.com/feed", cache=True)
+        response = client.get("https://example.com/feed", cache=True)
+
+        assert server.requests[1]["If-None-Match"] == '"1"'
+        assert response.from_cache
+        assert response.status_code == 200
+        assert response.content == b"feed"
+
+    def test_changed_response_replaces_cached_one(self, tmp_path):
+        server = FakeServer(
+            make_response(body=b"old", headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}),
+            make_response(body=b"new", headers={"Last-Modified": "Tue, 02 Jan 2024 00:00:00 GMT"}),
+            make_response(status_code=304),
+        )
+        client = make_client(tmp_path, server)
+
+        client.get("https://example.com/feed", cache=True)
+        assert client.get("https://example.com/feed", cache=True).content == b"new"
+        response = client.get("https://example.com/feed", cache=True)
+
+        assert server.requests[2]["If-Modified-Since"] == "Tue, 02 Jan 2024 00:00:00 GMT"
+        assert response.content == b"new"
+
+    def test_ttl_answers_from_cache_until_it_expires(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr("utils.http_client.time.time", lambda: now[0])
+        server = FakeServer(make_response(body=b"1"), make_response(body=b"2"))
+        client = make_client(tmp_path, server)
+
+        client.get("https://example.com/api", ttl=60)
+        now[0] += 59
+        assert client.get("https://example.com/api", ttl=60).content == b"1"
+        now[0] += 2
+        response = client.get("https://example.com/api", ttl=60)
+
+        assert len(server.requests) == 2
+        assert response.content == b"2"
+        assert not getattr(response, "from_cache", False)
+
+    def test_requests_with_credentials_are_not_cached(self, tmp_path):
+        server = FakeServer(
+            make_response(body=b"private", headers={"ETag": '"1"'}),
+            make_response(body=b"private", headers={"ETag": '"1"'}),
+        )
+        client = make_client(tmp_path, server)
+
+        client.get("https://example.com/api", headers={"Authorization": "Bearer secret"}, ttl=60)
+        client.get("https://example.com/api", headers={"x-api-key": "secret"}, cache=True)
+
+        assert not (tmp_path / "http").exists()
+        assert len(server.requests) == 2
+
+    def test_no_store_response_is_not_cached(self, tmp_path):
+        server = FakeServer(make_response(body=b"a", headers={"ETag": '"1"', "Cache-Control": "no-store"}))
+        client = make_client(tmp_path, server)
+
+        client.get("https://example.com/feed", cache=True)
+
+        assert not (tmp_path / "http").exists()
@@ -1,6 +1,7 @@
 import pytest
+from datetime import datetime
 
-from src.model import Playlist
+from src.model import Playlist, PlaylistManager, next_occurrence
 
 class TestPlaylist:
 
@@ -49,4 +50,61 @@ class TestPlaylist:
         playlist = Playlist("Test Playlist", start, end)
         assert playlist.is_active(current) == expected
         assert playlist.get_priority() == priority
-        
\ No newline at end of file
+        
+    def test_peek_next_plugin_does_not_advance(self):
+        plugins = [
+            {"plugin_id": "clock", "name": f"Clock {i}", "plugin_settings": {}, "refresh": {"interval": 60}}
+            for i in range(3)
+        ]
+        playlist = Playlist("Test Playlist", "00:00", "24:00", plugins)
+
+        assert playlist.peek_next_plugin().name == "Clock 0"
+        assert playlist.current_plugin_index is None
+
+        playlist.current_plugin_index = 2
+        assert playlist.peek_next_plugin().name == "Clock 0"
+        assert playlist.get_next_plugin().name == "Clock 0"
+        assert playlist.current_plugin_index == 0
+
+
+    def test_plugin_index_follows_changes(self):
+        playlist = Playlist("Test Playlist", "00:00", "24:00")
+        assert playlist.add_plugin({"plugin_id": "clock", "name": "Clock", "plugin_settings": {}, "refresh": {}})
+        assert not playlist.add_plugin({"plugin_id": "clock", "name": "Clock", "plugin_settings": {}, "refresh": {}})
+
+        playlist.update_plugin("clock", "Clock", {"name": "Kitchen Clock"})
+        assert playlist.find_plugin("clock", "Clock") is None
+        assert playlist.find_plugin("clock", "Kitchen Clock").name == "Kitchen Clock"
+
+        playlist.delete_plugin("clock", "Kitchen Clock")
+        assert playlist.find_plugin("clock", "Kitchen Clock") is None
+
+
+class TestPlaylistManager:
+
+    def test_active_playlist_follows_changes(self):
+        manager = PlaylistManager([Playlist("Default", "00:00", "24:00")])
+        manager.add_playlist("Morning", "06:00", "09:00")
+
+        assert manager.determine_active_playlist(datetime(2025, 1, 1, 7, 30)).name == "Morning"
+        assert manager.determine_active_playlist(datetime(2025, 1, 1, 9, 0)).name == "Default"
+
+        manager.update_playlist("Morning", "Breakfast", "08:00", "10:00")
+        assert manager.get_playlist("Morning") is None
+        assert manager.determine_active_playlist(datetime(2025, 1, 1, 9, 0)).name == "Breakfast"
+
+        manager.delete_playlist("Default")
+        assert manager.determine_active_playlist(datetime(2025, 1, 1, 7, 30)) is None
+
+@pytest.mark.parametrize(
+    "time_str,after,expected",
+    [
+        ("09:30", "2025-01-01T08:00", "2025-01-01T09:30"),  # later today
+        ("09:30", "2025-01-01T09:30", "2025-01-02T09:30"),  # exactly now, next day
+        ("09:30", "2025-01-01T23:00", "2025-01-02T09:30"),  # already passed
+        ("24:00", "2025-01-01T23:00", "2025-01-02T00:00"),  # end of day
+        ("00:00", "2025-01-01T00:00", "2025-01-02T00:00"),  # midnight
+    ]
+)
+def test_next_occurrence(time_str, after, expected):
+    assert next_occurrence(time_str, datetime.fromisoformat(after)) == datetime.fromisoformat(expected)
@@ -0,0 +1,90 @@
+from src.refresh_jobs import (
+    PRIORITY_BUTTON,
+    PRIORITY_SCHEDULED,
+    PRIORITY_WEB,
+    RefreshJob,
+    RefreshQueue,
+)
+
+
+class FakeAction:
+
+    def __init__(self, key, settings=None):
+        self.key = key
+        self.settings = settings
+
+    def get_job_key(self):
+        return self.key
+
+    def get_job_signature(self):
+        return f"{self.key}:{self.settings}"
+
+
+def make_job(key, settings=None, priority=PRIORITY_WEB):
+    return RefreshJob(FakeAction(key, settings), priority)
+
+
+class TestRefreshQueue:
+
+    def test_jobs_run_by_priority_then_submission_order(self):
+        queue = RefreshQueue()
+        first = queue.push(make_job("a", priority=PRIORITY_SCHEDULED))
+        second = queue.push(make_job("b"))
+        third = queue.push(make_job("c"))
+        fourth = queue.push(make_job("d", priority=PRIORITY_BUTTON))
+
+        assert [queue.pop() for _ in range(4)] == [fourth, second, third, first]
+
+    def test_identical_request_is_deduplicated(self):
+        queue = RefreshQueue()
+        job = queue.push(make_job("a", "x"))
+
+        assert queue.push(make_job("a", "x")) is job
+        assert len(queue) == 1
+        assert queue.get_metrics()["deduplicated"] == 1
+
+    def test_latest_request_for_a_key_wins(self):
+        queue = RefreshQueue()
+        job = queue.push(make_job("a", "x"))
+        queue.push(make_job("b"))
+        newer = make_job("a", "y")
+
+        assert queue.push(newer) is job
+        assert job.refresh_action is newer.refresh_action
+        assert job.signature == newer.signature
+        assert queue.pop() is job
+        assert queue.get_metrics()["coalesced"] == 1
+
+    def test_coalesced_request_raises_priority(self):
+        queue = RefreshQueue()
+        job = queue.push(make_job("a", priority=PRIORITY_SCHEDULED))
+        other = queue.push(make_job("b"))
+
+        queue.push(make_job("a", priority=PRIORITY_BUTTON))
+
+        assert job.priority == PRIORITY_BUTTON
+        assert [queue.pop(), queue.pop()] == [job, other]
+
+    def test_full_queue_drops_oldest_lowest_priority_job(self):
+        queue = RefreshQueue(max_depth=3)
+        oldest = queue.push(make_job("a", priority=PRIORITY_SCHEDULED))
+        newer = queue.push(make_job("b", priority=PRIORITY_SCHEDULED))
+        web = queue.push(make_job("c"))
+
+        job = queue.push(make_job("d"))
+
+        assert oldest.status == RefreshJob.CANCELLED
+        assert [queue.pop() for _ in range(3)] == [web, job, newer]
+        assert queue.get_metrics()["dropped"] == 1
+
+    def test_full_queue_rejects_lower_priority_job(self):
+        queue = RefreshQueue(max_depth=2)
+        queued = [queue.push(make_job("a")), queue.push(make_job("b"))]
+
+        job = queue.push(make_job("c", priority=PRIORITY_SCHEDULED))
+
+        assert job.status == RefreshJob.CANCELLED
+        assert job.error == "Refresh queue is full"
+        assert all(not queued_job.is_finished() for queued_job in queued)
+        assert len(queue) == 2
+        assert queue.get_metrics()["rejected"] == 1